@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Benchmark peak memory of LexicalRichness.from_file against reading the whole file.
+
+Each variant runs in a fresh interpreter and reports its peak resident set size, so that the
+memory held by one variant does not count towards the next.
+
+Usage
+-----
+    python benchmarks/bench_from_file.py [--megabytes 200]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+VARIANTS = {
+    "LexicalRichness(f.read())": (
+        "with open(path, encoding='utf-8') as f:\n"
+        "    lex = LexicalRichness(f.read())\n"
+    ),
+    "from_file(keep_tokens=True)": "lex = LexicalRichness.from_file(path)\n",
+    "from_file(keep_tokens=False)": (
+        "lex = LexicalRichness.from_file(path, keep_tokens=False)\n"
+    ),
+}
+
+MEASURE = """
+import resource, sys, time
+from lexicalrichness import LexicalRichness
+path = sys.argv[1]
+t0 = time.perf_counter()
+{variant}
+elapsed = time.perf_counter() - t0
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+# ru_maxrss is in kilobytes on Linux and in bytes on macOS
+peak = peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+print(elapsed, peak, lex.words, lex.terms, lex.yulek)
+"""
+
+
+def write_zipf_text(path, megabytes, rng):
+    """Write a file of Zipf-distributed words, one line of 1000 words at a time."""
+    written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        while written < megabytes * 2**20:
+            ranks = rng.zipf(1.3, size=1000)
+            line = " ".join("w{}".format(i) for i in ranks.tolist()) + ".\n"
+            f.write(line)
+            written += len(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--megabytes", type=int, default=200, help="Size of the text file."
+    )
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "corpus.txt")
+        write_zipf_text(path, args.megabytes, np.random.default_rng(0))
+
+        results = {}
+        for name, variant in VARIANTS.items():
+            out = subprocess.run(
+                [sys.executable, "-c", MEASURE.format(variant=variant), path],
+                check=True,
+                stdout=subprocess.PIPE,
+                universal_newlines=True,
+            )
+            elapsed, peak, *counts = out.stdout.split()
+            results[name] = counts
+            print(
+                "{:<30} {:6.2f} s, peak RSS {:8.1f} MiB".format(
+                    name, float(elapsed), float(peak)
+                )
+            )
+
+    if len(set(map(tuple, results.values()))) != 1:
+        print("FAIL: variants disagree on words, terms or Yule's K")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
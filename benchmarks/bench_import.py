@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Import-time benchmark for `lexicalrichness`.
+
+Each measurement runs in a fresh interpreter so that nothing is already cached in
+sys.modules. The script also checks that the basic measures can be computed without
+pulling in any of the heavy optional dependencies.
+
+Usage
+-----
+    python benchmarks/bench_import.py [--repeat 5]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+HEAVY_MODULES = ["matplotlib", "pandas", "scipy", "textblob"]
+
+TIME_IMPORT = """
+import time
+t0 = time.perf_counter()
+import lexicalrichness
+print(time.perf_counter() - t0)
+"""
+
+CHECK_MODULES = """
+import json, sys
+from lexicalrichness import LexicalRichness
+lex = LexicalRichness("The quick brown fox jumps over the lazy dog and the quick cat " * 20)
+_ = (lex.ttr, lex.rttr, lex.cttr, lex.Herdan, lex.Summer, lex.Dugast, lex.Maas,
+     lex.msttr(segment_window=25), lex.mattr(window_size=25), lex.mtld())
+heavy = {heavy}
+print(json.dumps(sorted(m for m in sys.modules if m.split(".")[0] in heavy)))
+""".format(heavy=HEAVY_MODULES)
+
+
+def run(code):
+    """Run a snippet in a fresh interpreter and return its stdout."""
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    return out.stdout.strip()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Number of cold imports to time."
+    )
+    args = parser.parse_args(argv)
+
+    timings = sorted(float(run(TIME_IMPORT)) for _ in range(args.repeat))
+    loaded = json.loads(run(CHECK_MODULES))
+
+    print(
+        "import lexicalrichness: best {:.1f} ms, median {:.1f} ms over {} runs".format(
+            1000 * timings[0], 1000 * timings[len(timings) // 2], len(timings)
+        )
+    )
+    if loaded:
+        print(
+            "FAIL: basic measures imported heavy modules: {}".format(", ".join(loaded))
+        )
+        return 1
+    print(
+        "OK: basic measures ran without importing {}".format(", ".join(HEAVY_MODULES))
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
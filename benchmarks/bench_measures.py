@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Time every LexicalRichness measure on synthetic Zipfian corpora of increasing size.
+
+Construction, preprocessing and tokenization, the frequency spectrum and every property and
+method of LexicalRichness are timed on corpora of 1k to 10M tokens (and the order-dependent
+methods again with encode=True). Results can be written to a JSON file and compared against a
+baseline saved by an earlier run, in which case the script exits with status 1 if any timing
+regressed by more than the threshold. Only NumPy and SciPy are needed, and nothing is downloaded.
+
+Usage
+-----
+    python benchmarks/bench_measures.py [--sizes 1000 10000] [--output results.json]
+    python benchmarks/bench_measures.py --baseline results.json [--threshold 0.25]
+"""
+
+import argparse
+import json
+import platform
+import re
+import sys
+import time
+import timeit
+
+import numpy as np
+
+import lexicalrichness
+from lexicalrichness import LexicalRichness, preprocess, tokenize
+
+SIZES = [10**3, 10**4, 10**5, 10**6, 10**7]
+
+PROPERTIES = [
+    "ttr",
+    "rttr",
+    "cttr",
+    "Herdan",
+    "Summer",
+    "Dugast",
+    "Maas",
+    "yulek",
+    "yulei",
+    "herdanvm",
+    "simpsond",
+]
+
+METHODS = [
+    "msttr",
+    "msttr_profile",
+    "mattr",
+    "mattr_profile",
+    "mtld",
+    "hdd",
+    "vocd",
+]
+
+
+def zipf_corpus(n_tokens, rng):
+    """Synthetic corpus whose term frequencies follow a Zipf law, as a list of tokens and as text.
+
+    Tokens with the same rank share one string object, so the list costs a pointer per token.
+    """
+    ranks = rng.zipf(1.3, size=n_tokens)
+    distinct, inverse = np.unique(ranks, return_inverse=True)
+    vocab = ["w{}".format(rank) for rank in distinct.tolist()]
+    tokens = [vocab[i] for i in inverse.tolist()]
+    return tokens, " ".join(tokens)
+
+
+def benchmarks(tokens, text):
+    """Map benchmark name -> zero-argument callable for one corpus."""
+    lex = LexicalRichness(tokens, preprocessor=None, tokenizer=None)
+    encoded = LexicalRichness(tokens, preprocessor=None, tokenizer=None, encode=True)
+
+    def spectrum():
+        lex._spectrum = None
+        return lex.frequency_spectrum
+
+    cases = {
+        "preprocess": lambda: preprocess(text),
+        "tokenize": lambda: tokenize(text),
+        "init(text)": lambda: LexicalRichness(text),
+        "init(tokens)": lambda: LexicalRichness(
+            tokens, preprocessor=None, tokenizer=None
+        ),
+        "init(tokens, encode=True)": lambda: LexicalRichness(
+            tokens, preprocessor=None, tokenizer=None, encode=True
+        ),
+        "frequency_spectrum": spectrum,
+    }
+    for name in PROPERTIES:
+        cases[name] = (lambda name: lambda: getattr(lex, name))(name)
+    for name in METHODS:
+        cases[name] = getattr(lex, name)
+        cases["{}[encode=True]".format(name)] = getattr(encoded, name)
+    return cases
+
+
+def best_time(func, repeat, budget):
+    """Best time per call in seconds, over up to repeat measurements of at least 0.2 s each.
+
+    A call that alone takes longer than budget seconds is measured only once.
+    """
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    best = elapsed / number
+    if elapsed < budget and repeat > 1:
+        best = min([best] + [t / number for t in timer.repeat(repeat - 1, number)])
+    return best
+
+
+def run(sizes, selected, repeat, budget, seed):
+    """Time the selected benchmarks (all if None) on a corpus of each size."""
+    rng = np.random.default_rng(seed)
+    results = []
+    for n_tokens in sizes:
+        tokens, text = zipf_corpus(n_tokens, rng)
+        for name, func in benchmarks(tokens, text).items():
+            if selected and re.split(r"[\[(]", name)[0] not in selected:
+                continue
+            seconds = best_time(func, repeat, budget)
+            results.append({"name": name, "tokens": n_tokens, "seconds": seconds})
+            print("{:<28} {:>10,} tokens {:>12.6f} s".format(name, n_tokens, seconds))
+            sys.stdout.flush()
+    return results
+
+
+def compare(results, baseline, threshold, min_seconds):
+    """Print the change against a baseline and return the benchmarks that regressed.
+
+    A benchmark regresses if it is slower than the baseline by more than the fraction threshold
+    and by more than min_seconds, which keeps timer noise on very fast measures from failing a run.
+    """
+    previous = {(r["name"], r["tokens"]): r["seconds"] for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        key = (result["name"], result["tokens"])
+        if key not in previous:
+            continue
+        old, new = previous[key], result["seconds"]
+        regressed = new > old * (1 + threshold) and new - old > min_seconds
+        print(
+            "{:<28} {:>10,} tokens {:>12.6f} s -> {:>12.6f} s ({:+.0%}){}".format(
+                key[0],
+                key[1],
+                old,
+                new,
+                new / old - 1,
+                "  REGRESSION" if regressed else "",
+            )
+        )
+        if regressed:
+            regressions.append(result)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=SIZES, help="Corpus sizes in tokens."
+    )
+    parser.add_argument(
+        "--measures",
+        nargs="+",
+        help="Only run these benchmarks, e.g. mattr vocd init (default: all).",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Number of timing measurements."
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=1.0,
+        help="Seconds above which a call is measured only once.",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the corpora.")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", help="Compare against results saved by --output.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Relative slowdown that counts as a regression (default=0.25).",
+    )
+    parser.add_argument(
+        "--min-seconds",
+        type=float,
+        default=1e-4,
+        help="Absolute slowdown below which a change is ignored as noise.",
+    )
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.measures, args.repeat, args.budget, args.seed)
+
+    if args.output:
+        report = {
+            "metadata": {
+                "lexicalrichness": lexicalrichness.__version__,
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "platform": platform.platform(),
+                "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "seed": args.seed,
+            },
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print()
+        regressions = compare(results, baseline, args.threshold, args.min_seconds)
+        if regressions:
+            print(
+                "FAIL: {} benchmark(s) slower than the baseline by more than {:.0%}".format(
+                    len(regressions), args.threshold
+                )
+            )
+            return 1
+        print("OK: no regression beyond {:.0%}".format(args.threshold))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Benchmark the bytes translation-table tokenizer against the original replace loop.
+
+The reference implementation is the previous preprocess/tokenize pair: a regex pass and three
+str.replace calls to preprocess, then one str.replace per punctuation character. The script
+checks that both produce identical tokens before timing them.
+
+Usage
+-----
+    python benchmarks/bench_tokenize.py [--megabytes 5]
+"""
+
+import argparse
+import re
+import string
+import sys
+import time
+
+import numpy as np
+
+from lexicalrichness import preprocess, tokenize
+
+
+def reference_preprocess(text):
+    """Preprocess with a regex and one str.replace per dash."""
+    text = re.sub(r"[0-9]+", "", text.lower())
+    text = text.replace("–", "")
+    text = text.replace("—", "")
+    text = text.replace("-", "")
+    return text
+
+
+def reference_tokenize(text):
+    """Tokenize with one str.replace per punctuation character."""
+    text = reference_preprocess(text)
+    for p in list(string.punctuation):
+        text = text.replace(p, " ")
+    return text.split()
+
+
+def synthetic_text(n_chars, rng):
+    """Text with words, digits, dashes and punctuation in roughly natural proportions."""
+    words = [
+        "Lexical",
+        "richness",
+        "of",
+        "the",
+        "text",
+        "well-known",
+        "score—high",
+        "42,",
+    ]
+    words += ["(McCarthy", "2005)", "e.g.", "TTR;", "“quoted”", "–", "don't", "end."]
+    picks = rng.integers(0, len(words), size=n_chars // 6)
+    return " ".join(words[i] for i in picks.tolist())
+
+
+def best_time(func, text, repeat=3):
+    """Best wall time of func(text) over repeat runs."""
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func(text)
+        timings.append(time.perf_counter() - t0)
+    return min(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megabytes", type=float, default=5, help="Size of the text.")
+    args = parser.parse_args(argv)
+
+    text = synthetic_text(int(args.megabytes * 2**20), np.random.default_rng(0))
+    if tokenize(preprocess(text)) != reference_tokenize(reference_preprocess(text)):
+        print("FAIL: tokens differ from the reference implementation")
+        return 1
+
+    def pipeline(text):
+        return tokenize(preprocess(text))
+
+    def reference_pipeline(text):
+        return reference_tokenize(reference_preprocess(text))
+
+    for name, new, old in [
+        ("preprocess", preprocess, reference_preprocess),
+        ("tokenize(preprocess(text))", pipeline, reference_pipeline),
+    ]:
+        new_time, old_time = best_time(new, text), best_time(old, text)
+        print(
+            "{:<28} reference {:.3f} s, bytes table {:.3f} s ({:.1f}x)".format(
+                name, old_time, new_time, old_time / new_time
+            )
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Benchmark the batched vocd sampler against the original per-sample loop.
+
+The reference implementation draws each subsample with random.sample and counts distinct
+tokens with len(set(...)), as vocd did before sampling was vectorized.
+
+Usage
+-----
+    python benchmarks/bench_vocd.py [--docs 200] [--tokens 500]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+import numpy as np
+from scipy.optimize import curve_fit
+
+from lexicalrichness import LexicalRichness, ttr_nd
+
+
+def reference_vocd(wordlist, ntokens=50, within_sample=100, iterations=3, seed=42):
+    """vocd with one random.sample call per subsample."""
+    random.seed(seed)
+    adapted_d = []
+    for _ in range(iterations):
+        ydata = []
+        for ntoken in range(35, 1 + ntokens):
+            ttr_results = [
+                len(set(random.sample(wordlist, k=ntoken))) / ntoken
+                for _ in range(within_sample)
+            ]
+            ydata.append(np.mean(ttr_results))
+        popt, _ = curve_fit(ttr_nd, list(range(35, 1 + ntokens)), ydata)
+        adapted_d.append(popt[0])
+    return np.mean(adapted_d)
+
+
+def zipf_document(n_tokens, rng):
+    """Synthetic document whose term frequencies follow a Zipf law."""
+    return ["w{}".format(i) for i in rng.zipf(1.3, size=n_tokens).tolist()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=200, help="Number of documents.")
+    parser.add_argument("--tokens", type=int, default=500, help="Tokens per document.")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    docs = [zipf_document(args.tokens, rng) for _ in range(args.docs)]
+
+    t0 = time.perf_counter()
+    for doc in docs:
+        reference_vocd(doc)
+    reference = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for doc in docs:
+        LexicalRichness(doc, tokenizer=None).vocd()
+    batched = time.perf_counter() - t0
+
+    print(
+        "vocd over {} documents of {} tokens: reference {:.2f} s, batched {:.2f} s "
+        "({:.1f}x)".format(
+            args.docs, args.tokens, reference, batched, reference / batched
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,3 +8,6 @@ __email__ = 'lucas@lucasshen.com'
 __version__ = '0.5.1'
 
 from .lexicalrichness import *
+from .corpus import batch, iter_batch
+from .profiling import Profiler
+from .cache import DiskCache, ResultCache
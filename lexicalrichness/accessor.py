@@ -0,0 +1,166 @@
+"""pandas Series accessor for lexical richness measures, registered as ``Series.lex``.
+
+Importing this module registers the accessor (and imports pandas):
+
+import lexicalrichness.accessor
+
+df.text.lex.measures(["ttr", "mtld", "hdd"])
+"""
+
+#  -*-  coding:  utf-8  -*-
+import pandas as pd
+
+from .corpus import batch
+from .lexicalrichness import Vocabulary, _applies_preprocessor, preprocess, tokenize
+
+
+def _encode_rows(rows, vocabulary):
+    """Encode lists of tokens as int32 id arrays of a Vocabulary shared across rows.
+
+    Other values (texts, missing values) are passed through unchanged. Ids are assigned in order
+    of first appearance across the rows.
+    """
+    for row in rows:
+        if isinstance(row, list):
+            row = vocabulary.encode(row)
+        yield row
+
+
+def _tokenize_row(row, preprocessor, tokenizer):
+    """Tokens of a row: a text is preprocessed and tokenized, a list of tokens kept as is."""
+    if isinstance(row, list):
+        return row
+    if _applies_preprocessor(preprocessor, tokenizer):
+        row = preprocessor(row)
+    return tokenizer(row)
+
+
+@pd.api.extensions.register_series_accessor("lex")
+class LexicalRichnessAccessor(object):
+    """Lexical richness measures for a pandas Series of texts (or of lists of tokens).
+
+    Example:
+
+    import lexicalrichness.accessor
+
+    df.text.lex.measures(["ttr", "mtld", "hdd"], n_jobs=4, mtld={"threshold": 0.72})
+
+    Parameters
+    ----------
+    series: pandas.Series
+        Texts as strings, or lists of tokens if already tokenized.
+    """
+
+    def __init__(self, series):
+        self._series = series
+
+    def measures(
+        self,
+        measures=("ttr",),
+        n_jobs=1,
+        chunksize=64,
+        preprocessor=preprocess,
+        tokenizer=tokenize,
+        errors="raise",
+        seed=None,
+        **params
+    ):
+        """Compute lexical richness measures for every row, optionally across processes.
+
+        Rows are scored in chunks of chunksize by LexicalRichness.report (see batch). Rows that are
+        lists of tokens are encoded against a vocabulary shared across rows before they are
+        dispatched, so worker processes receive compact int32 id arrays instead of strings and
+        score the ids directly; the measures only compare tokens for equality, so the results are
+        the same. Rows that are texts are sent as they are and tokenized by the workers.
+
+        Parameters
+        ----------
+        measures: list of string
+            Names of the LexicalRichness attributes and measures to compute (see MEASURES).
+        n_jobs: int
+            Number of worker processes (default=1, no pool). -1 uses every CPU.
+        chunksize: int
+            Number of rows sent to a worker at a time (default=64).
+        preprocessor: callable or None
+            Preprocessor passed to LexicalRichness. Must be picklable if n_jobs > 1.
+        tokenizer: callable or None
+            Tokenizer passed to LexicalRichness. Must be picklable if n_jobs > 1.
+        errors: string
+            "raise" (default) or "coerce" to return NaN where a measure cannot be computed (e.g.
+            for a missing value).
+        seed: int or None
+            If given, vocd uses an independent random stream per row, so results do not depend
+            on n_jobs or chunksize (see iter_batch).
+        **params: dict
+            Keyword arguments for the measures that are methods, keyed by measure name, e.g.
+            mattr={"window_size": 50}.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One column per measure, with the index of the Series.
+        """
+        rows = _encode_rows(self._series, Vocabulary())
+        result = batch(
+            rows,
+            measures,
+            params,
+            n_jobs,
+            chunksize,
+            preprocessor,
+            tokenizer,
+            errors,
+            as_frame=True,
+            seed=seed,
+        )
+        result.index = self._series.index
+        return result
+
+    def tokens(self, preprocessor=preprocess, tokenizer=tokenize):
+        """Tokenize every row, storing each distinct term once across all rows.
+
+        Parameters
+        ----------
+        preprocessor: callable or None
+            A callable for preprocessing the text. Default is the built-in `preprocess` function.
+        tokenizer: callable
+            A callable for tokenizing the text. Default is the built-in `tokenize` function.
+
+        Returns
+        -------
+        pandas.Series
+            Lists of tokens, with the index of the Series.
+        """
+        token_ids, vocab = self.encode(preprocessor, tokenizer)
+        return token_ids.map(lambda ids: [vocab[i] for i in ids.tolist()])
+
+    def encode(self, preprocessor=preprocess, tokenizer=tokenize):
+        """Tokenize every row into integer ids of a vocabulary shared across all rows.
+
+        Rows that are already lists of tokens are encoded as they are.
+
+        Example:
+
+        pd.Series(["a b a", "b c"]).lex.encode() ->
+            (Series([array([0, 1, 0]), array([1, 2])]), ["a", "b", "c"])
+
+        Parameters
+        ----------
+        preprocessor: callable or None
+            A callable for preprocessing the text. Default is the built-in `preprocess` function.
+        tokenizer: callable
+            A callable for tokenizing the text. Default is the built-in `tokenize` function.
+
+        Returns
+        -------
+        tuple
+            (pandas.Series of int32 token id arrays with the index of the Series, list of terms
+            indexed by id)
+        """
+        vocabulary = Vocabulary()
+        rows = (_tokenize_row(row, preprocessor, tokenizer) for row in self._series)
+        token_ids = list(_encode_rows(rows, vocabulary))
+        return (
+            pd.Series(token_ids, index=self._series.index, dtype=object),
+            list(vocabulary),
+        )
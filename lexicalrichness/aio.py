@@ -0,0 +1,186 @@
+"""Score texts from asyncio code without blocking the event loop."""
+
+#  -*-  coding:  utf-8  -*-
+import asyncio
+import functools
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from .cache import _check_cacheable
+from .corpus import score_document
+from .lexicalrichness import _check_measures, preprocess, tokenize
+
+
+class AsyncLexicalRichness(object):
+    """Compute lexical richness measures in an executor, awaitable from asyncio code.
+
+    Every call to score runs LexicalRichness and its measures in a thread or process pool, so
+    the event loop keeps serving other requests while vocd or hdd run. At most max_concurrency
+    texts are submitted at once: further calls wait for a free slot, which keeps the queue of the
+    executor bounded when requests arrive faster than they can be scored.
+
+    A call can be cancelled or given a timeout, which covers both the wait for a slot and the
+    scoring. Work that has not started is then dropped. Work that has started cannot be
+    interrupted and keeps its slot until it finishes, so a pathological document occupies one
+    worker but the other max_concurrency - 1 slots keep serving requests.
+
+    Example:
+
+    alex = AsyncLexicalRichness(executor="process", max_workers=4, timeout=2.0)
+
+    scores = await alex.score(text, measures=["ttr", "mtld", "vocd"])
+
+    await alex.close()
+
+    Parameters
+    ----------
+    executor: string or concurrent.futures.Executor
+        "thread" (default) to score in a pool of threads, "process" to score in a pool of
+        processes (the measures then run in parallel, but the preprocessor and tokenizer must be
+        picklable), or an existing executor, which close() leaves running.
+    max_workers: int or None
+        Number of workers of the pool created for "thread" or "process" (default: the number of
+        CPUs).
+    max_concurrency: int or None
+        Maximum number of texts submitted to the executor at once (default: max_workers, or the
+        number of CPUs for an existing executor).
+    timeout: float or None
+        Default number of seconds after which score raises asyncio.TimeoutError (default=None,
+        no timeout).
+    preprocessor: callable or None
+        Preprocessor passed to LexicalRichness. Default is the built-in `preprocess` function.
+    tokenizer: callable or None
+        Tokenizer passed to LexicalRichness. Default is the built-in `tokenize` function.
+    cache: DiskCache, ResultCache or None
+        If given, texts are loaded from this cache (see score_document). A ResultCache is only
+        shared with an executor of threads.
+    """
+
+    def __init__(
+        self,
+        executor="thread",
+        max_workers=None,
+        max_concurrency=None,
+        timeout=None,
+        preprocessor=preprocess,
+        tokenizer=tokenize,
+        cache=None,
+    ):
+        _check_cacheable(cache, preprocessor, tokenizer)
+        max_workers = max_workers or os.cpu_count() or 1
+        if isinstance(executor, Executor):
+            self._executor = executor
+            self._owns_executor = False
+        elif executor == "thread":
+            self._executor = ThreadPoolExecutor(max_workers=max_workers)
+            self._owns_executor = True
+        elif executor == "process":
+            self._executor = ProcessPoolExecutor(max_workers=max_workers)
+            self._owns_executor = True
+        else:
+            raise ValueError(
+                "executor should be 'thread', 'process' or an Executor, got {!r}.".format(
+                    executor
+                )
+            )
+        self.max_concurrency = max_concurrency or max_workers
+        if self.max_concurrency < 1:
+            raise ValueError("max_concurrency must be a positive integer.")
+        self.timeout = timeout
+        self.preprocessor = preprocessor
+        self.tokenizer = tokenizer
+        self.cache = cache
+        # created on first use, inside the running event loop
+        self._semaphore = None
+
+    async def score(
+        self, text, measures=("ttr",), params=None, timeout=None, errors="raise"
+    ):
+        """Compute the requested measures for a text in the executor.
+
+        Parameters
+        ----------
+        text: string or list
+            Text of the document, or a list of tokens if it is already tokenized.
+        measures: list of string
+            Names of the LexicalRichness attributes and measures to compute (see MEASURES).
+        params: dict or None
+            Keyword arguments for the measures that are methods, keyed by measure name, e.g.
+            {"vocd": {"seed": 1}}.
+        timeout: float or None
+            Seconds after which to give up (default: the timeout of the object).
+        errors: string
+            "raise" (default) or "coerce" to return NaN where a measure cannot be computed.
+
+        Returns
+        -------
+        dict
+            Measure name -> value.
+
+        Raises
+        ------
+        asyncio.TimeoutError
+            If the text is not scored within the timeout.
+        """
+        measures, params = _check_measures(measures, params, errors)
+        if timeout is None:
+            timeout = self.timeout
+        values = await asyncio.wait_for(
+            self._submit(text, measures, params, errors), timeout
+        )
+        return dict(zip(measures, values))
+
+    async def _submit(self, text, measures, params, errors):
+        """Wait for a free slot, run score_document in the executor and await its result."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        semaphore = self._semaphore
+        loop = asyncio.get_running_loop()
+        await semaphore.acquire()
+        try:
+            future = self._executor.submit(
+                score_document,
+                text,
+                measures,
+                params,
+                self.preprocessor,
+                self.tokenizer,
+                errors,
+                self.cache,
+            )
+        except BaseException:
+            semaphore.release()
+            raise
+        # the slot is freed when the work is done (or dropped before it started), not when the
+        # caller stops waiting, so the executor never holds more than max_concurrency texts
+        future.add_done_callback(
+            functools.partial(_release_threadsafe, loop, semaphore)
+        )
+        return await asyncio.wrap_future(future)
+
+    async def close(self):
+        """Shut down the executor created by this object, once its running work is done."""
+        if self._owns_executor:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._executor.shutdown)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def __repr__(self):
+        return (
+            "AsyncLexicalRichness(executor={}, max_concurrency={}, timeout={})".format(
+                type(self._executor).__name__, self.max_concurrency, self.timeout
+            )
+        )
+
+
+def _release_threadsafe(loop, semaphore, future):
+    """Release semaphore from the thread that completed future."""
+    try:
+        loop.call_soon_threadsafe(semaphore.release)
+    except RuntimeError:  # the event loop is closed
+        pass
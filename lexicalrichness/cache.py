@@ -0,0 +1,794 @@
+"""Caches that let repeated documents skip preprocessing and tokenization."""
+
+#  -*-  coding:  utf-8  -*-
+import functools
+import hashlib
+import inspect
+import os
+import re
+import struct
+import sys
+import tempfile
+import threading
+import types
+import zipfile
+from collections import OrderedDict
+
+import numpy as np
+
+from . import __version__
+from .lexicalrichness import (
+    METHODS,
+    FrequencySpectrum,
+    LexicalRichness,
+    _check_measures,
+    preprocess,
+    tokenize,
+)
+
+# Version of the layout of the cached files, part of every key
+_FORMAT_VERSION = 1
+
+# Arrays stored for each document, in an uncompressed .npz archive
+_MEMBERS = ("token_ids", "counts", "vocab_bytes", "vocab_offsets")
+
+
+# Package whose own preprocessors and tokenizers are identified by name and __version__
+_PACKAGE = __name__.rpartition(".")[0]
+
+# Values identified by their type and repr
+_SCALARS = (type(None), bool, int, float, complex, str, bytes)
+
+# Callables without Python code, identified by their qualified name
+_BUILTINS = (
+    types.BuiltinFunctionType,
+    types.MethodDescriptorType,
+    types.WrapperDescriptorType,
+)
+
+
+def _in_package(func):
+    module = getattr(func, "__module__", None) or ""
+    return module == _PACKAGE or module.startswith(_PACKAGE + ".")
+
+
+def _code_names(code):
+    """Global and attribute names used by a code object and the code objects nested in it."""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _code_names(const)
+    return names
+
+
+def _hash_value(digest, value, seen):
+    """Feed a description of value to digest: the code, constants, defaults, closure and the
+    globals it uses for a Python function, recursively. Raises TypeError for a value whose
+    behaviour cannot be described this way (e.g. an arbitrary object).
+    """
+    if isinstance(value, _SCALARS):
+        digest.update("{}:{!r}\0".format(type(value).__name__, value).encode("utf-8"))
+    elif id(value) in seen:
+        # recursive functions and self-referencing containers (only objects that stay alive
+        # during the traversal are recorded, as the id of a freed object can be reused)
+        digest.update(b"<seen>\0")
+    elif isinstance(value, types.FunctionType):
+        if _in_package(value):
+            # covered by the package version, which is part of every key
+            digest.update(
+                "{}.{}\0".format(value.__module__, value.__qualname__).encode()
+            )
+            return
+        seen.add(id(value))
+        digest.update("function:{}\0".format(value.__qualname__).encode("utf-8"))
+        _hash_value(digest, value.__code__, seen)
+        _hash_value(digest, value.__defaults__, seen)
+        _hash_value(digest, value.__kwdefaults__, seen)
+        for cell in value.__closure__ or ():
+            try:
+                _hash_value(digest, cell.cell_contents, seen)
+            except ValueError:  # empty cell
+                digest.update(b"<empty>\0")
+        for name in sorted(_code_names(value.__code__)):
+            if name in value.__globals__:
+                digest.update("global:{}\0".format(name).encode("utf-8"))
+                _hash_value(digest, value.__globals__[name], seen)
+    elif isinstance(value, types.CodeType):
+        digest.update(value.co_code)
+        _hash_value(digest, value.co_consts, seen)
+        _hash_value(digest, value.co_names, seen)
+        _hash_value(digest, value.co_varnames, seen)
+    elif isinstance(value, (tuple, list)):
+        if isinstance(value, list):
+            seen.add(id(value))
+        digest.update("{}:{}\0".format(type(value).__name__, len(value)).encode())
+        for item in value:
+            _hash_value(digest, item, seen)
+    elif isinstance(value, (set, frozenset, dict)):
+        if not isinstance(value, frozenset):
+            seen.add(id(value))
+        items = (
+            value.items() if isinstance(value, dict) else ((item,) for item in value)
+        )
+        # order-independent: hash each item on its own and sort the digests
+        item_digests = []
+        for item in items:
+            item_digest = hashlib.blake2b(digest_size=16)
+            _hash_value(item_digest, tuple(item), seen)
+            item_digests.append(item_digest.digest())
+        digest.update("{}:{}\0".format(type(value).__name__, len(value)).encode())
+        digest.update(b"".join(sorted(item_digests)))
+    elif isinstance(value, types.ModuleType):
+        digest.update("module:{}\0".format(value.__name__).encode("utf-8"))
+    elif isinstance(value, re.Pattern):
+        digest.update("pattern:{}\0".format(value.flags).encode())
+        _hash_value(digest, value.pattern, seen)
+    elif isinstance(value, _BUILTINS + (type,)):
+        module = getattr(value, "__module__", None) or "builtins"
+        digest.update("{}.{}\0".format(module, value.__qualname__).encode("utf-8"))
+    else:
+        raise TypeError(type(value).__name__)
+
+
+def _callable_identity(func):
+    """Stable description of a preprocessor or tokenizer, which changes when its behaviour may.
+
+    A Python function is described by its qualified name and a digest of its bytecode,
+    constants, names, default arguments, closure contents and of the global functions and values
+    it uses, recursively. Built-in functions and methods (e.g. str.split), and the functions of
+    this package, are described by their qualified name (the package version is part of every
+    key). Lambdas, functools.partial objects, bound methods and other callable objects have no
+    stable description and raise a TypeError, as does a function that uses such an object.
+    """
+    if func is None:
+        return "None"
+    if isinstance(func, _BUILTINS) or (
+        isinstance(func, types.FunctionType) and _in_package(func)
+    ):
+        module = getattr(func, "__module__", None) or "builtins"
+        return "{}.{}".format(module, func.__qualname__)
+    if isinstance(func, types.FunctionType) and func.__name__ != "<lambda>":
+        digest = hashlib.blake2b(digest_size=16)
+        try:
+            _hash_value(digest, func, set())
+        except TypeError as e:
+            reason = "it uses a {} object".format(e)
+        else:
+            return "{}.{}:{}".format(
+                func.__module__, func.__qualname__, digest.hexdigest()
+            )
+    else:
+        reason = "{} objects have no stable identity".format(type(func).__name__)
+    raise TypeError(
+        "Cannot derive a cache key from {!r}: {}. Use a module-level function or pass "
+        "cache_key= to name the preprocessor and tokenizer.".format(func, reason)
+    )
+
+
+def _check_text(text):
+    if not isinstance(text, str):
+        raise TypeError(
+            "Only texts (strings) can be cached, got {}.".format(type(text).__name__)
+        )
+
+
+def _processing_identity(preprocessor, tokenizer, cache_key=None):
+    """Identity of a preprocessor and tokenizer, or of cache_key instead, as used in text keys."""
+    if cache_key is not None:
+        return "key:{}".format(cache_key)
+    return "{}\0{}".format(
+        _callable_identity(preprocessor), _callable_identity(tokenizer)
+    )
+
+
+def _text_key(text, identity):
+    """Hash of a text, the identity of its preprocessing (see _processing_identity), the package
+    version and the cache format.
+    """
+    _check_text(text)
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(
+        "{}\0{}\0{}\0".format(_FORMAT_VERSION, __version__, identity).encode("utf-8")
+    )
+    digest.update(text.encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+def _check_cacheable(cache, preprocessor, tokenizer):
+    """Raise the TypeError of a DiskCache key up front, before documents are scored (where the
+    error would be coerced to NaN for every document).
+    """
+    if isinstance(cache, DiskCache) and tokenizer:
+        cache.key("", preprocessor, tokenizer)
+
+
+def _encode_vocab(vocab):
+    """Terms as one UTF-8 buffer and the offsets of each term in it."""
+    encoded = [term.encode("utf-8", "surrogatepass") for term in vocab]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(term) for term in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _decode_vocab(vocab_bytes, offsets):
+    data = vocab_bytes.tobytes()
+    bounds = offsets.tolist()
+    return [
+        data[start:end].decode("utf-8", "surrogatepass")
+        for start, end in zip(bounds[:-1], bounds[1:])
+    ]
+
+
+def _memmap_npz(path):
+    """Arrays of an uncompressed .npz archive, memory-mapped instead of read into memory.
+
+    np.load ignores mmap_mode for .npz archives, so the offset of each member is found from its
+    zip and .npy headers and the data is mapped directly.
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as f:
+        for info in archive.infolist():
+            name = info.filename[: -len(".npy")]
+            if info.compress_type != zipfile.ZIP_STORED:
+                arrays[name] = np.load(archive.open(info))
+                continue
+            f.seek(info.header_offset + 26)
+            name_length, extra_length = struct.unpack("<HH", f.read(4))
+            f.seek(name_length + extra_length, os.SEEK_CUR)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                header = np.lib.format.read_array_header_1_0(f)
+            else:
+                header = np.lib.format.read_array_header_2_0(f)
+            shape, fortran_order, dtype = header
+            if not np.prod(shape) or dtype.hasobject:
+                # np.memmap cannot map zero bytes
+                arrays[name] = np.load(archive.open(info), allow_pickle=False)
+                continue
+            arrays[name] = np.memmap(
+                path,
+                dtype=dtype,
+                mode="r",
+                offset=f.tell(),
+                shape=shape,
+                order="F" if fortran_order else "C",
+            )
+    return arrays
+
+
+class DiskCache(object):
+    """Content-addressed cache of tokenized documents on disk, bounded in size.
+
+    Each document is stored under a hash of its text and of the identity of the preprocessor and
+    tokenizer, as an uncompressed .npz archive holding its integer token ids, vocabulary and term
+    counts (the frequency spectrum). A cached document is loaded by memory-mapping the archive,
+    so repeated runs over the same corpus, e.g. with different measure parameters, skip
+    preprocessing and tokenization entirely and only read the pages of the token ids that the
+    measures touch.
+
+    A Python function used as preprocessor or tokenizer is identified by its qualified name and
+    a digest of its code, constants, default arguments, closure and the global functions and
+    values it uses, so redefining or editing it (or a helper it calls) gives new keys. Built-in
+    functions such as str.split and the functions of this package are identified by name, and
+    the package version is part of every key. Lambdas, functools.partial objects, bound methods
+    and other callable objects cannot be identified: load raises a TypeError for them unless
+    cache_key names the preprocessing instead. Tokens must be strings.
+
+    The identity of a preprocessor and tokenizer is derived the first time the cache object sees
+    them and reused for every later document, so only the text is hashed per document. Global
+    values that the functions use should therefore not be modified while the object is in use.
+
+    When the files take more than max_bytes, the least recently used ones are deleted. Files are
+    written atomically, so several processes can share a cache directory.
+
+    Example:
+
+    cache = DiskCache("~/.cache/lexicalrichness", max_bytes=2**30)
+
+    lex = cache.load(text)
+
+    batch(texts, ["mattr", "mtld"], cache=cache)
+
+    Parameters
+    ----------
+    directory: string or path-like
+        Directory of the cache, created if needed.
+    max_bytes: int or None
+        Size above which the least recently used files are evicted (default=2**30, 1 GiB). If
+        None, the cache is not bounded.
+
+    Attributes
+    ----------
+    hits: int
+        Number of documents loaded from the cache by this object.
+    misses: int
+        Number of documents tokenized and stored by this object.
+    """
+
+    def __init__(self, directory, max_bytes=2**30):
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = None
+        # (preprocessor, tokenizer) -> identity, so that it is derived once per pair and not
+        # for every document
+        self._identities = {}
+        os.makedirs(self.directory, exist_ok=True)
+
+    def __getstate__(self):
+        # the functions are sent to worker processes separately; each worker derives their
+        # identity again
+        state = self.__dict__.copy()
+        state["_identities"] = {}
+        return state
+
+    def key(self, text, preprocessor=preprocess, tokenizer=tokenize, cache_key=None):
+        """Key of a document: a hash of its text, preprocessor, tokenizer, the package version and
+        the file format.
+
+        Parameters
+        ----------
+        text: string
+            Text of the document.
+        preprocessor: callable or None
+            Preprocessor the text is processed with.
+        tokenizer: callable
+            Tokenizer the text is processed with.
+        cache_key: string or None
+            Name of the preprocessing, used in place of the identity of preprocessor and
+            tokenizer (e.g. for a lambda or a configured tokenizer object). Texts processed
+            differently must be given different names.
+
+        Returns
+        -------
+        string
+            Hexadecimal digest.
+
+        Raises
+        ------
+        TypeError
+            If cache_key is None and the preprocessor or tokenizer cannot be identified.
+        """
+        if cache_key is not None:
+            return _text_key(text, _processing_identity(None, None, cache_key))
+        pair = (_callable_key(preprocessor), _callable_key(tokenizer))
+        identity = self._identities.get(pair)
+        if identity is None:
+            identity = _processing_identity(preprocessor, tokenizer)
+            self._identities[pair] = identity
+        return _text_key(text, identity)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".npz")
+
+    def load(
+        self,
+        text,
+        preprocessor=preprocess,
+        tokenizer=tokenize,
+        keep_tokens=True,
+        cache_key=None,
+    ):
+        """LexicalRichness of a text, loaded from the cache or tokenized and stored in it.
+
+        Parameters
+        ----------
+        text: string
+            Text of the document.
+        preprocessor: callable or None
+            A callable for preprocessing the text. Default is the built-in `preprocess` function.
+        tokenizer: callable
+            A callable for tokenizing the text. Default is the built-in `tokenize` function.
+        keep_tokens: bool
+            If True (default), the object holds the (memory-mapped) token ids, as with
+            encode=True. If False, it only holds the term counts (see LexicalRichness).
+        cache_key: string or None
+            Name of the preprocessing, used in place of the identity of preprocessor and
+            tokenizer (see key).
+
+        Returns
+        -------
+        LexicalRichness
+        """
+        if not tokenizer:
+            raise ValueError("A tokenizer is required to cache a text.")
+        path = self._path(self.key(text, preprocessor, tokenizer, cache_key))
+        try:
+            arrays = _memmap_npz(path)
+            os.utime(path)
+        except (OSError, ValueError, zipfile.BadZipFile):
+            arrays = None
+
+        if arrays is not None and set(_MEMBERS) <= set(arrays):
+            self.hits += 1
+        else:
+            self.misses += 1
+            arrays = self._store(path, text, preprocessor, tokenizer)
+        return self._from_arrays(arrays, preprocessor, tokenizer, keep_tokens)
+
+    def _store(self, path, text, preprocessor, tokenizer):
+        """Tokenize text and write its arrays to path. Returns the arrays."""
+        lex = LexicalRichness(
+            text, preprocessor=preprocessor, tokenizer=tokenizer, encode=True
+        )
+        token_ids, vocab = lex.token_ids, lex.vocab
+        vocab_bytes, vocab_offsets = _encode_vocab(vocab)
+        arrays = {
+            "token_ids": token_ids,
+            "counts": np.bincount(token_ids, minlength=len(vocab)).astype(np.int64),
+            "vocab_bytes": vocab_bytes,
+            "vocab_offsets": vocab_offsets,
+        }
+
+        # write to a temporary file and rename it, so readers never see a partial archive
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        if self.max_bytes is not None:
+            if self._size is None:
+                self._size = self.size()
+            else:
+                self._size += os.path.getsize(path)
+            if self._size > self.max_bytes:
+                self._evict()
+        return arrays
+
+    @staticmethod
+    def _from_arrays(arrays, preprocessor, tokenizer, keep_tokens):
+        """LexicalRichness object built from the cached arrays of a document."""
+        vocab = _decode_vocab(arrays["vocab_bytes"], arrays["vocab_offsets"])
+        lex = LexicalRichness.__new__(LexicalRichness)
+        lex.preprocessor = preprocessor
+        lex.tokenizer = tokenizer
+        lex.keep_tokens = keep_tokens
+        lex._wordlist = None
+        lex.token_ids = arrays["token_ids"] if keep_tokens else None
+        lex.vocab = vocab
+        lex._spectrum = FrequencySpectrum(dict(zip(vocab, arrays["counts"].tolist())))
+        lex.words = lex._spectrum.words
+        lex.terms = lex._spectrum.terms
+        return lex
+
+    def _entries(self):
+        """(modification time, size, path) of every cached file."""
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".npz"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:  # evicted by another process
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def size(self):
+        """Total size of the cached files in bytes.
+
+        Returns
+        -------
+        int
+        """
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        """Delete the least recently used files until the cache fits in max_bytes."""
+        entries = sorted(self._entries())
+        size = sum(entry[1] for entry in entries)
+        for _, file_size, path in entries:
+            if size <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            size -= file_size
+        self._size = size
+
+    def clear(self):
+        """Delete every cached file."""
+        for _, _, path in self._entries():
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+        self._size = 0
+
+    def __repr__(self):
+        return "DiskCache(directory={!r}, max_bytes={}, hits={}, misses={})".format(
+            self.directory, self.max_bytes, self.hits, self.misses
+        )
+
+
+# Approximate bytes taken by the key and bookkeeping of an entry of a ResultCache
+_ENTRY_BYTES = 256
+
+
+class _ByIdentity(object):
+    """Key wrapper for an unhashable callable object, equal only to itself."""
+
+    __slots__ = ("obj",)
+
+    def __init__(self, obj):
+        self.obj = obj
+
+    def __hash__(self):
+        return id(self.obj)
+
+    def __eq__(self, other):
+        return isinstance(other, _ByIdentity) and other.obj is self.obj
+
+
+def _callable_key(func):
+    """The callable itself as part of an in-process key. The key holds a reference to it, so
+    its id cannot be reused by another object while the entry exists.
+    """
+    try:
+        hash(func)
+    except TypeError:
+        return _ByIdentity(func)
+    return func
+
+
+class _Uncacheable(Exception):
+    """Raised for parameters that cannot be part of a cache key (e.g. a random generator)."""
+
+
+def _freeze(value):
+    """Hashable form of a measure parameter, with equal parameters giving equal keys."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (np.integer, np.floating)):
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, np.ndarray):
+        return ("ndarray", value.dtype.str, value.shape, value.tobytes())
+    if isinstance(value, np.random.SeedSequence):
+        return (
+            "SeedSequence",
+            _freeze(value.entropy),
+            value.spawn_key,
+            value.pool_size,
+        )
+    raise _Uncacheable(type(value).__name__)
+
+
+def _value_bytes(value):
+    """Approximate memory taken by a cached measure value."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes + _ENTRY_BYTES
+    return sys.getsizeof(value) + _ENTRY_BYTES
+
+
+def _object_bytes(lex):
+    """Approximate memory taken by an encoded LexicalRichness: its token ids and vocabulary."""
+    return (
+        lex.token_ids.nbytes
+        + sys.getsizeof(lex.vocab)
+        + sum(map(sys.getsizeof, lex.vocab))
+        + _ENTRY_BYTES
+    )
+
+
+def _memoized(name):
+    """Method of _CachedLexicalRichness that looks up LexicalRichness.name in the ResultCache."""
+    signature = inspect.signature(getattr(LexicalRichness, name))
+
+    @functools.wraps(getattr(LexicalRichness, name))
+    def method(self, *args, **kwargs):
+        # resolved at call time, so that it is the method a Profiler has instrumented
+        compute = getattr(LexicalRichness, name)
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        params = [(k, v) for k, v in bound.arguments.items() if k != "self"]
+        if name == "vocd" and bound.arguments["seed"] is None:
+            # unseeded vocd is random: never reuse a result
+            return compute(self, *args, **kwargs)
+        try:
+            key = (self._key, name, _freeze(params))
+        except _Uncacheable:
+            return compute(self, *args, **kwargs)
+        return self._cache._get_or_compute(
+            key, lambda: compute(self, *args, **kwargs), _value_bytes
+        )
+
+    return method
+
+
+class _CachedLexicalRichness(LexicalRichness):
+    """LexicalRichness whose measure methods are memoized in the ResultCache that built it."""
+
+
+for _name in METHODS:
+    setattr(_CachedLexicalRichness, _name, _memoized(_name))
+
+
+class ResultCache(object):
+    """Thread-safe in-process LRU cache of tokenized texts and of the measures computed on them.
+
+    load(text) tokenizes a text once and returns the same (encoded) LexicalRichness object for
+    every later call with an equal text and the same preprocessor and tokenizer objects (any
+    callables, including lambdas and partials, compared as objects rather than by name). The methods of that object
+    (msttr, mattr, mtld, hdd, vocd) look up their result under (text hash, measure, parameters)
+    first, the vocd seed being one of the parameters, so a duplicate text gets its measures
+    without tokenizing or computing anything. Unseeded vocd (seed=None) and parameters that have
+    no stable value (e.g. a numpy.random.Generator) are computed every time. The properties (ttr,
+    yulek, ...) are not cached, as they only cost a few arithmetic operations once the object
+    exists.
+
+    Tokenized texts and results share one least-recently-used order. Once their approximate size
+    (token ids, vocabulary, result values and a fixed overhead per entry) exceeds max_bytes, the
+    least recently used entries are dropped. The cache can be shared between threads; a value
+    that two threads miss at the same time may be computed twice. The objects returned by load
+    are shared and should be treated as read-only.
+
+    A cache is only shared within a process: a copy sent to worker processes (e.g. batch with
+    n_jobs > 1) starts empty.
+
+    Example:
+
+    cache = ResultCache(max_bytes=2**28)
+
+    cache.score(text, "mtld", threshold=0.72)
+
+    cache.load(text).vocd(seed=42)
+
+    cache.stats() -> {"hits": ..., "misses": ..., "evictions": ..., "entries": ..., "bytes": ...}
+
+    Parameters
+    ----------
+    max_bytes: int
+        Approximate memory above which the least recently used entries are evicted
+        (default=2**27, 128 MiB).
+    """
+
+    def __init__(self, max_bytes=2**27):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.clear()
+
+    def __getstate__(self):
+        return {"max_bytes": self.max_bytes}
+
+    def __setstate__(self, state):
+        self.__init__(state["max_bytes"])
+
+    def _get_or_compute(self, key, compute, size):
+        """Cached value of key, or compute() stored under key if it is missing."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                value = self._entries[key][0]
+                return value.copy() if isinstance(value, np.ndarray) else value
+            self._misses += 1
+
+        value = compute()
+        nbytes = size(value)
+        if nbytes <= self.max_bytes:
+            with self._lock:
+                if key not in self._entries:
+                    self._entries[key] = (value, nbytes)
+                    self._bytes += nbytes
+                    while self._bytes > self.max_bytes:
+                        _, (_, evicted) = self._entries.popitem(last=False)
+                        self._bytes -= evicted
+                        self._evictions += 1
+        return value.copy() if isinstance(value, np.ndarray) else value
+
+    def load(self, text, preprocessor=preprocess, tokenizer=tokenize):
+        """LexicalRichness of a text, tokenized once and shared by every call with an equal text.
+
+        Parameters
+        ----------
+        text: string
+            Text of the document.
+        preprocessor: callable or None
+            A callable for preprocessing the text. Default is the built-in `preprocess` function.
+        tokenizer: callable
+            A callable for tokenizing the text. Default is the built-in `tokenize` function.
+
+        Returns
+        -------
+        LexicalRichness
+            An encoded object (see encode=True) whose methods are memoized in this cache.
+        """
+        if not tokenizer:
+            raise ValueError("A tokenizer is required to cache a text.")
+        _check_text(text)
+        key = (
+            hashlib.blake2b(
+                text.encode("utf-8", "surrogatepass"), digest_size=20
+            ).digest(),
+            _callable_key(preprocessor),
+            _callable_key(tokenizer),
+        )
+
+        def tokenized():
+            lex = _CachedLexicalRichness(
+                text, preprocessor=preprocessor, tokenizer=tokenizer, encode=True
+            )
+            lex._cache = self
+            lex._key = key
+            return lex
+
+        return self._get_or_compute((key,), tokenized, _object_bytes)
+
+    def score(
+        self, text, measure, preprocessor=preprocess, tokenizer=tokenize, **params
+    ):
+        """Value of one measure of a text, from the cache if it was computed before.
+
+        Example:
+
+        cache.score(text, "mattr", window_size=50)
+
+        Parameters
+        ----------
+        text: string
+            Text of the document.
+        measure: string
+            Name of a LexicalRichness attribute or measure (see MEASURES).
+        preprocessor: callable or None
+            A callable for preprocessing the text. Default is the built-in `preprocess` function.
+        tokenizer: callable
+            A callable for tokenizing the text. Default is the built-in `tokenize` function.
+        **params: dict
+            Keyword arguments of the measure, if it is a method.
+
+        Returns
+        -------
+        float, int or numpy.ndarray
+        """
+        (measure,), params = _check_measures(
+            [measure], {measure: params} if params else None
+        )
+        value = getattr(self.load(text, preprocessor, tokenizer), measure)
+        if measure in METHODS:
+            value = value(**params.get(measure, {}))
+        return value
+
+    def stats(self):
+        """Hit and miss counts and size of the cache.
+
+        Returns
+        -------
+        dict
+            "hits" and "misses" (lookups of tokenized texts and of results), "evictions",
+            "entries", "bytes" (approximate) and "max_bytes".
+        """
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def clear(self):
+        """Drop every entry and reset the statistics."""
+        with self._lock:
+            self._entries = OrderedDict()
+            self._bytes = 0
+            self._hits = self._misses = self._evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return "ResultCache(max_bytes={}, entries={}, hits={}, misses={})".format(
+            self.max_bytes, len(self._entries), self._hits, self._misses
+        )
@@ -0,0 +1,408 @@
+"""Command-line interface: score text files, directories and JSONL/CSV corpora.
+
+Usage
+-----
+    lexicalrichness essay.txt corpus/ -m words ttr mtld --jobs 8 -o scores.jsonl
+    lexicalrichness reviews.csv --text-column body --id-column review_id -o scores.csv
+    cat posts.jsonl | lexicalrichness --format jsonl -m mattr --param mattr.window_size=50
+    lexicalrichness corpus/ -m mtld -o scores.jsonl --resume
+"""
+
+#  -*-  coding:  utf-8  -*-
+import argparse
+import csv
+import fnmatch
+import json
+import math
+import os
+import sys
+from collections import deque
+
+import numpy as np
+
+from .cache import DiskCache
+from .corpus import iter_batch
+from .lexicalrichness import MEASURES, _check_measures
+
+FORMATS = ("text", "lines", "jsonl", "csv")
+
+# Input format of a file, by extension (other files are read as one text each)
+_EXTENSIONS = {".jsonl": "jsonl", ".ndjson": "jsonl", ".csv": "csv"}
+
+
+def _detect_format(path):
+    """Input format of a file from its extension."""
+    return _EXTENSIONS.get(os.path.splitext(path)[1].lower(), "text")
+
+
+class BadDocument(ValueError):
+    """A row of the input without a usable text or id, e.g. invalid JSON or a missing column."""
+
+
+def _parse_json(line):
+    """Object of a JSON line, or the error message if the line is not a JSON object."""
+    try:
+        row = json.loads(line)
+    except ValueError as e:
+        return "invalid JSON ({})".format(e)
+    if not isinstance(row, dict):
+        return "not a JSON object"
+    return row
+
+
+def _read_stream(stream, source, fmt, text_column, id_column, errors):
+    """Yield (id, text) for each document of an open stream of lines, JSON lines or CSV rows.
+
+    Documents without an id column are identified by their source and row number. A row
+    without a text or id raises BadDocument naming its source and row number if errors is
+    "raise". If errors is "coerce", its text is None and a missing id is replaced by the source
+    and row number.
+    """
+    if fmt == "csv":
+        rows = csv.DictReader(stream)
+    elif fmt == "jsonl":
+        rows = (_parse_json(line) for line in stream if line.strip())
+    else:
+        rows = (line.rstrip("\r\n") for line in stream)
+
+    for number, row in enumerate(rows, 1):
+        location = "{}:{}".format(source, number)
+        if fmt == "lines":
+            yield location, row
+            continue
+
+        if isinstance(row, str):  # the error of an invalid JSON line
+            problem, doc_id, text = row, None, None
+        else:
+            doc_id = row.get(id_column) if id_column else location
+            text = row.get(text_column)
+            if doc_id is None:
+                problem = "no {!r} field".format(id_column)
+            elif not isinstance(text, str):
+                problem = "no {!r} text".format(text_column)
+            else:
+                yield str(doc_id), text
+                continue
+        if errors == "raise":
+            raise BadDocument("{}: {}.".format(location, problem))
+        yield location if doc_id is None else str(doc_id), None
+
+
+def iter_documents(
+    inputs,
+    fmt=None,
+    text_column="text",
+    id_column=None,
+    pattern="*.txt",
+    encoding="utf-8",
+    errors="raise",
+):
+    """Yield (id, text) for each document of the inputs, in order.
+
+    Parameters
+    ----------
+    inputs: list of string
+        Paths of files or directories (searched recursively for files matching pattern), or "-"
+        for stdin.
+    fmt: string or None
+        "text" (each file is a document), "lines" (each line is a document), "jsonl" or "csv"
+        (each row is a document, with its text in text_column). If None, detected from the
+        file extension (.jsonl, .ndjson, .csv, else text), and "lines" for stdin.
+    text_column: string
+        Field of the JSON lines or CSV rows that holds the text.
+    id_column: string or None
+        Field that identifies the rows (default: source and row number). The id of a text file
+        is its path.
+    pattern: string
+        Shell pattern of the file names read from directories (default="*.txt").
+    encoding: string
+        Encoding of the files.
+    errors: string
+        "raise" (default) to raise BadDocument, naming the source and row, for a JSONL/CSV row
+        that is not valid or has no text or id field, or "coerce" to yield its text as None
+        (with the source and row number as id if the id is missing).
+
+    Yields
+    ------
+    tuple
+        (id, text)
+    """
+    csv.field_size_limit(2**31 - 1)
+    for source in inputs:
+        if source == "-":
+            for document in _read_stream(
+                sys.stdin, "<stdin>", fmt or "lines", text_column, id_column, errors
+            ):
+                yield document
+            continue
+
+        if os.path.isdir(source):
+            paths = []
+            for root, dirs, files in os.walk(source):
+                dirs.sort()
+                paths.extend(
+                    os.path.join(root, name)
+                    for name in sorted(fnmatch.filter(files, pattern))
+                )
+        else:
+            paths = [source]
+
+        for path in paths:
+            path_fmt = fmt or _detect_format(path)
+            with open(path, encoding=encoding, newline="") as f:
+                if path_fmt == "text":
+                    yield path, f.read()
+                    continue
+                for document in _read_stream(
+                    f, path, path_fmt, text_column, id_column, errors
+                ):
+                    yield document
+
+
+def _plain(value):
+    """Value as a plain Python object for JSON and CSV: NaN becomes None, arrays lists."""
+    if isinstance(value, np.ndarray):
+        return [_plain(item) for item in value.tolist()]
+    if isinstance(value, (np.integer, np.floating)):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def _csv_value(value):
+    """Plain value as a CSV field: None is empty and lists are written as JSON."""
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return json.dumps(value)
+    return value
+
+
+def _parse_params(assignments):
+    """Measure parameters from strings "measure.name=value", with JSON values (e.g. 50, 0.72,
+    [25, 50]) and other values kept as strings.
+    """
+    params = {}
+    for assignment in assignments:
+        key, sep, value = assignment.partition("=")
+        measure, dot, name = key.partition(".")
+        if not sep or not dot:
+            raise ValueError(
+                "Parameters should look like measure.name=value, got {!r}.".format(
+                    assignment
+                )
+            )
+        try:
+            value = json.loads(value)
+        except ValueError:
+            pass
+        params.setdefault(measure, {})[name] = value
+    return params
+
+
+def _completed_ids(path, output_format):
+    """Ids and columns already written to an output file, after cutting off a partly written
+    last line. The columns are None if the file is empty.
+    """
+    with open(path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            f.truncate(end)
+    lines = data[:end].decode("utf-8").splitlines()
+    if output_format == "csv":
+        rows = csv.reader(lines)
+        columns = next(rows, None)
+        return {row[0] for row in rows}, columns
+    records = [json.loads(line) for line in lines if line.strip()]
+    columns = list(records[0]) if records else None
+    return {record["id"] for record in records}, columns
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="lexicalrichness",
+        description="Compute lexical richness measures for text files, directories and "
+        "JSONL/CSV corpora, and write one JSONL or CSV row per document.",
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="*",
+        default=["-"],
+        help="Files, directories or - for stdin (default: stdin).",
+    )
+    parser.add_argument(
+        "-m",
+        "--measures",
+        nargs="+",
+        default=["words", "terms", "ttr"],
+        choices=MEASURES,
+        metavar="MEASURE",
+        help="Measures to compute (default: words terms ttr). Choose from: {}.".format(
+            ", ".join(MEASURES)
+        ),
+    )
+    parser.add_argument(
+        "-p",
+        "--param",
+        action="append",
+        default=[],
+        metavar="MEASURE.NAME=VALUE",
+        help="Parameter of a measure, e.g. mattr.window_size=50 (repeatable).",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=FORMATS,
+        help="Input format: text (one document per file), lines (one per line), jsonl or "
+        "csv (default: from the file extension, lines for stdin).",
+    )
+    parser.add_argument(
+        "--text-column", default="text", help="Text field of JSONL/CSV rows."
+    )
+    parser.add_argument(
+        "--id-column",
+        help="Id field of JSONL/CSV rows (default: source and row number).",
+    )
+    parser.add_argument(
+        "--pattern",
+        default="*.txt",
+        help="File names read from directories (default: *.txt).",
+    )
+    parser.add_argument("--encoding", default="utf-8", help="Encoding of the inputs.")
+    parser.add_argument(
+        "-o", "--output", help="Output file (default: stdout), .jsonl or .csv."
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=("jsonl", "csv"),
+        help="Output format (default: from the output extension, else jsonl).",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip the documents already in the output file and append the others.",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes (default: 1, -1 for every CPU).",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=64,
+        help="Documents sent to a worker at a time (default: 64).",
+    )
+    parser.add_argument(
+        "--seed", type=int, help="Seed of the per-document vocd random streams."
+    )
+    parser.add_argument(
+        "--errors",
+        choices=("coerce", "raise"),
+        default="coerce",
+        help="coerce (default) writes null for measures that cannot be computed and for "
+        "rows without a text, raise stops.",
+    )
+    parser.add_argument(
+        "--cache", help="Directory of a DiskCache of tokenized documents."
+    )
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        params = _parse_params(args.param)
+        _check_measures(args.measures, params)
+    except ValueError as e:
+        parser.error(str(e))
+    output_format = args.output_format or (
+        "csv" if args.output and args.output.lower().endswith(".csv") else "jsonl"
+    )
+    if args.resume and not args.output:
+        parser.error("--resume needs --output.")
+    if args.jobs < 1 and args.jobs != -1:
+        parser.error("--jobs must be a positive integer or -1.")
+    if args.chunksize < 1:
+        parser.error("--chunksize must be a positive integer.")
+
+    done, columns = set(), None
+    if args.resume and os.path.exists(args.output):
+        done, columns = _completed_ids(args.output, output_format)
+        if columns is not None and columns != ["id"] + args.measures:
+            parser.error(
+                "--resume: {} has columns {}, not id and the requested measures.".format(
+                    args.output, ", ".join(columns)
+                )
+            )
+
+    # ids of the documents handed to iter_batch and not yet written, in order
+    pending = deque()
+
+    def documents():
+        # numbered by position in the whole input, so that --seed gives every document the
+        # same vocd samples whether or not the run is resumed
+        for i, (doc_id, text) in enumerate(
+            iter_documents(
+                args.inputs,
+                args.format,
+                args.text_column,
+                args.id_column,
+                args.pattern,
+                args.encoding,
+                args.errors,
+            )
+        ):
+            if doc_id in done:
+                continue
+            pending.append(doc_id)
+            yield i, text
+
+    if args.output:
+        out = open(
+            args.output, "a" if args.resume else "w", newline="", encoding="utf-8"
+        )
+    else:
+        out = sys.stdout
+    try:
+        if output_format == "csv":
+            writer = csv.writer(out)
+            if columns is None:
+                writer.writerow(["id"] + args.measures)
+        rows = iter_batch(
+            documents(),
+            args.measures,
+            params,
+            n_jobs=args.jobs,
+            chunksize=args.chunksize,
+            errors=args.errors,
+            seed=args.seed,
+            cache=DiskCache(args.cache) if args.cache else None,
+            indexed=True,
+        )
+        for row in rows:
+            doc_id = pending.popleft()
+            values = [_plain(row[name]) for name in args.measures]
+            if output_format == "csv":
+                writer.writerow([doc_id] + [_csv_value(value) for value in values])
+            else:
+                record = {"id": doc_id}
+                record.update(zip(args.measures, values))
+                out.write(json.dumps(record) + "\n")
+    except BadDocument as e:
+        parser.error(str(e))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        else:
+            out.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
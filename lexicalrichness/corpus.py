@@ -0,0 +1,275 @@
+"""Score many documents with LexicalRichness, optionally across a process pool."""
+
+#  -*-  coding:  utf-8  -*-
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+
+from .cache import _check_cacheable
+from .lexicalrichness import (
+    LexicalRichness,
+    _check_measures,
+    _LazyModule,
+    preprocess,
+    tokenize,
+)
+
+pd = _LazyModule("pandas")
+
+
+def score_document(
+    text,
+    measures,
+    params=None,
+    preprocessor=preprocess,
+    tokenizer=tokenize,
+    errors="raise",
+    cache=None,
+):
+    """Compute the requested measures for a single document.
+
+    Parameters
+    ----------
+    text: string, list or numpy.ndarray
+        Text of the document, or a list (or array of integer ids) of tokens if it is already
+        tokenized, in which case preprocessor and tokenizer are not applied.
+    measures: list of string
+        Names of the LexicalRichness attributes and measures to compute (see MEASURES).
+    params: dict or None
+        Keyword arguments for the measures that are methods, keyed by measure name, e.g.
+        {"mattr": {"window_size": 50}}.
+    preprocessor: callable or None
+        Preprocessor passed to LexicalRichness.
+    tokenizer: callable or None
+        Tokenizer passed to LexicalRichness.
+    errors: string
+        "raise" (default) to propagate errors such as a text shorter than the mattr window, or
+        "coerce" to return NaN for the measures that could not be computed.
+    cache: DiskCache, ResultCache or None
+        If given, a text is loaded from this cache of tokenized documents (and stored in it if
+        missing) instead of being preprocessed and tokenized. A ResultCache also reuses the
+        results of the methods.
+
+    Returns
+    -------
+    tuple
+        Values of the measures, in the order of measures.
+    """
+    params = params or {}
+    try:
+        if isinstance(text, np.ndarray):
+            lex = LexicalRichness._from_token_ids(text)
+        elif isinstance(text, list):
+            lex = LexicalRichness(text, preprocessor=None, tokenizer=None)
+        elif cache is not None and tokenizer:
+            lex = cache.load(text, preprocessor=preprocessor, tokenizer=tokenizer)
+        else:
+            lex = LexicalRichness(text, preprocessor=preprocessor, tokenizer=tokenizer)
+    except Exception:
+        if errors == "raise":
+            raise
+        return (np.nan,) * len(measures)
+
+    values = lex.report(measures, errors=errors, **params)
+    return tuple(values[name] for name in measures)
+
+
+def _score_chunk(
+    documents, measures, params, preprocessor, tokenizer, errors, seed, cache
+):
+    """Score a chunk of (document number, text) pairs in a worker process."""
+    if seed is None or "vocd" not in measures:
+        return [
+            score_document(
+                text, measures, params, preprocessor, tokenizer, errors, cache
+            )
+            for _, text in documents
+        ]
+
+    scores = []
+    for i, text in documents:
+        # document i draws from child i of SeedSequence(seed), wherever it is scored
+        vocd_params = dict(params.get("vocd", {}))
+        vocd_params["seed"] = np.random.SeedSequence(seed, spawn_key=(i,))
+        document_params = dict(params, vocd=vocd_params)
+        scores.append(
+            score_document(
+                text, measures, document_params, preprocessor, tokenizer, errors, cache
+            )
+        )
+    return scores
+
+
+def iter_batch(
+    texts,
+    measures=("ttr",),
+    params=None,
+    n_jobs=1,
+    chunksize=64,
+    preprocessor=preprocess,
+    tokenizer=tokenize,
+    errors="raise",
+    seed=None,
+    cache=None,
+    indexed=False,
+):
+    """Lazily compute lexical richness measures for a stream of documents, in input order.
+
+    Documents are read from texts in chunks of chunksize and, if n_jobs > 1, scored in a process
+    pool. At most 2 * n_jobs chunks are in flight at any time, so the corpus is never held in
+    memory as a whole and texts can be a generator over a file or database.
+
+    Parameters
+    ----------
+    texts: iterable
+        Documents as strings, or as lists of tokens if already tokenized.
+    measures: list of string
+        Names of the LexicalRichness attributes and measures to compute (see MEASURES), e.g.
+        ["words", "ttr", "mtld", "hdd"].
+    params: dict or None
+        Keyword arguments for the measures that are methods, keyed by measure name, e.g.
+        {"mattr": {"window_size": 50}, "hdd": {"draws": 30}}.
+    n_jobs: int
+        Number of worker processes (default=1, no pool). -1 uses every CPU.
+    chunksize: int
+        Number of documents sent to a worker at a time (default=64).
+    preprocessor: callable or None
+        Preprocessor passed to LexicalRichness. Must be picklable (e.g. a module-level function)
+        if n_jobs > 1.
+    tokenizer: callable or None
+        Tokenizer passed to LexicalRichness. Must be picklable if n_jobs > 1.
+    errors: string
+        "raise" (default) to stop at the first document a measure cannot be computed for, or
+        "coerce" to return NaN for it instead.
+    seed: int or None
+        If given, vocd draws the random samples of document i from child i of
+        numpy.random.SeedSequence(seed), overriding any seed in params, so that documents get
+        independent random streams and the results do not depend on n_jobs or chunksize. If None
+        (default), every document uses the vocd seed in params (or its default).
+    cache: DiskCache, ResultCache or None
+        If given, texts are loaded from this cache of tokenized documents, and tokenized and
+        stored in it if missing, so that re-scoring a corpus (e.g. with other params) skips
+        preprocessing and tokenization. Worker processes share the directory of a DiskCache; a
+        ResultCache (which also reuses the results of the methods for duplicate texts) is only
+        shared when n_jobs=1.
+    indexed: bool
+        If True, texts yields (i, text) pairs and document i draws its vocd samples from child i
+        of the seed, e.g. to score the rest of a partly scored corpus with the same random
+        streams as a run over the whole corpus. If False (default), the documents are numbered
+        0, 1, 2, ... in the order of texts.
+
+    Yields
+    ------
+    dict
+        Measure name -> value, one dict per document.
+    """
+    measures, params = _check_measures(measures, params, errors)
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    if n_jobs < 1 or chunksize < 1:
+        raise ValueError(
+            "n_jobs and chunksize must be positive integers (or n_jobs=-1)."
+        )
+    _check_cacheable(cache, preprocessor, tokenizer)
+
+    documents = iter(texts) if indexed else enumerate(texts)
+    chunks = iter(lambda: list(islice(documents, chunksize)), [])
+    args = (measures, params, preprocessor, tokenizer, errors, seed, cache)
+
+    if n_jobs == 1:
+        for chunk in chunks:
+            for values in _score_chunk(chunk, *args):
+                yield dict(zip(measures, values))
+        return
+
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_score_chunk, chunk, *args))
+            if len(pending) >= 2 * n_jobs:
+                for values in pending.popleft().result():
+                    yield dict(zip(measures, values))
+        while pending:
+            for values in pending.popleft().result():
+                yield dict(zip(measures, values))
+
+
+def batch(
+    texts,
+    measures=("ttr",),
+    params=None,
+    n_jobs=1,
+    chunksize=64,
+    preprocessor=preprocess,
+    tokenizer=tokenize,
+    errors="raise",
+    as_frame=False,
+    seed=None,
+    cache=None,
+):
+    """Compute lexical richness measures for a corpus of documents, optionally across processes.
+
+    Example:
+
+    batch(texts, measures=["ttr", "mtld", "hdd"], n_jobs=4) ->
+        {"ttr": array([...]), "mtld": array([...]), "hdd": array([...])}
+
+    See Also
+    --------
+    iter_batch:
+        Lazily compute the measures document by document.
+
+    Parameters
+    ----------
+    texts: iterable
+        Documents as strings, or as lists of tokens if already tokenized.
+    measures: list of string
+        Names of the LexicalRichness attributes and measures to compute (see MEASURES).
+    params: dict or None
+        Keyword arguments for the measures that are methods, keyed by measure name.
+    n_jobs: int
+        Number of worker processes (default=1, no pool). -1 uses every CPU.
+    chunksize: int
+        Number of documents sent to a worker at a time (default=64).
+    preprocessor: callable or None
+        Preprocessor passed to LexicalRichness. Must be picklable if n_jobs > 1.
+    tokenizer: callable or None
+        Tokenizer passed to LexicalRichness. Must be picklable if n_jobs > 1.
+    errors: string
+        "raise" (default) or "coerce" to return NaN where a measure cannot be computed.
+    as_frame: bool
+        If True, return a pandas DataFrame instead of a dict of arrays (default=False).
+    seed: int or None
+        If given, vocd uses an independent random stream per document (see iter_batch).
+    cache: DiskCache, ResultCache or None
+        If given, texts are loaded from this cache of tokenized documents (see iter_batch).
+
+    Returns
+    -------
+    dict or pandas.DataFrame
+        Measure name -> NumPy array of values, in input order.
+    """
+    measures, params = _check_measures(measures, params)
+    columns = {name: [] for name in measures}
+    for row in iter_batch(
+        texts,
+        measures,
+        params,
+        n_jobs,
+        chunksize,
+        preprocessor,
+        tokenizer,
+        errors,
+        seed,
+        cache,
+    ):
+        for name in measures:
+            columns[name].append(row[name])
+
+    result = {name: np.asarray(values) for name, values in columns.items()}
+    if as_frame:
+        return pd.DataFrame(result, columns=measures)
+    return result
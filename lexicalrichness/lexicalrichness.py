@@ -1,28 +1,66 @@
 """LexicalRichness module."""
+
 #  -*-  coding:  utf-8  -*-
 import sys
 
 if sys.version_info[0] == 3:
     from statistics import mean
 
-import random
-import re
+import copy
+import importlib
+import importlib.util
+import mmap
+import os
+import reprlib
 import string
+import threading
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from itertools import islice
-from math import log, sqrt
+from math import fsum, log, sqrt
 
-import matplotlib.pyplot as plt
 import numpy as np
-import pandas as pd
-from scipy.optimize import curve_fit
-from scipy.stats import hypergeom
 
-try:
-    from textblob import TextBlob
-except ImportError:
-    pass
-else:
+
+class _LazyModule(object):
+    """Stand-in for a module that is only imported on first attribute access.
+
+    matplotlib, pandas, scipy and textblob take far longer to import than the basic
+    measures take to compute, so they are loaded by the code that first needs them
+    rather than by `import lexicalrichness`.
+
+    Parameters
+    ----------
+    name: string
+        Fully qualified name of the module to import, e.g. "scipy.stats".
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        if attr in ("_name", "_module"):
+            # not yet initialised (e.g. while being copied); avoid recursing into _load
+            raise AttributeError(attr)
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return "<lazy module '{}' ({})>".format(self._name, state)
+
+
+plt = _LazyModule("matplotlib.pyplot")
+pd = _LazyModule("pandas")
+_optimize = _LazyModule("scipy.optimize")
+_textblob = _LazyModule("textblob")
+
+if importlib.util.find_spec("textblob") is not None:
 
     def blobber(text):
         """Tokenize text into a list of tokens using TextBlob.
@@ -35,10 +73,33 @@ else:
         ------
         TextBlob list of words
         """
-        blob = TextBlob(text)
+        blob = _textblob.TextBlob(text)
         return blob.words
 
 
+# Translation tables applied after lower-casing: preprocess deletes digits and dashes/hyphens;
+# tokenize also replaces the remaining punctuation with spaces before splitting on whitespace.
+# Digits and dashes are deleted, punctuation is replaced by a space. All of these except the en
+# and em dashes are ASCII, so the work is done on the UTF-8 encoding of the text with a 256-entry
+# bytes table: multi-byte UTF-8 sequences never contain ASCII bytes, so this cannot split a
+# character, and bytes.translate runs much faster than str.translate with a mapping.
+_DELETED_BYTES = (string.digits + "-").encode()
+_WIDE_DASHES = ("\u2013".encode("utf-8"), "\u2014".encode("utf-8"))
+_PREPROCESS_TABLE = bytes.maketrans(b"", b"")
+_TOKENIZE_TABLE = bytes.maketrans(
+    string.punctuation.encode(), b" " * len(string.punctuation)
+)
+
+
+def _translate(text, table):
+    """Lower-case text, delete digits and dashes and map the remaining bytes through table."""
+    data = text.lower().encode("utf-8", "surrogatepass")
+    for dash in _WIDE_DASHES:
+        if dash in data:
+            data = data.replace(dash, b"")
+    return data.translate(table, _DELETED_BYTES).decode("utf-8", "surrogatepass")
+
+
 def preprocess(text):
     """Preprocess text (minimal).
 
@@ -46,6 +107,8 @@ def preprocess(text):
     2. removes digits
     3. removes variations of dashes and hyphens
 
+    Steps 2 and 3 are a single pass over the text with a precompiled translation table.
+
     Parameter
     ---------
     text: string
@@ -54,22 +117,16 @@ def preprocess(text):
     -------
     string
     """
-    # lowercase and remove digits
-    text = re.sub(r"[0-9]+", "", text.lower())
-
-    # Replace dashes/hyphens
-    if sys.version_info[0] == 3:
-        text = text.replace("–", "")
-        text = text.replace("—", "")
-        text = text.replace("-", "")
-    else:
-        text = text.replace("-", "")
-    return text
+    return _translate(text, _PREPROCESS_TABLE)
 
 
 def tokenize(text):
     """Tokenize text into a list of tokens using built-in methods.
 
+    The text is preprocessed (see preprocess), punctuation is replaced by spaces and the text is
+    split on whitespace. Preprocessing and the punctuation replacement share one precompiled
+    translation table, so the cost no longer grows with the number of punctuation characters.
+
     Parameter
     ---------
     text: string
@@ -78,13 +135,17 @@ def tokenize(text):
     -------
     list
     """
-    text = preprocess(text)
+    return _translate(text, _TOKENIZE_TABLE).split()
 
-    for p in list(string.punctuation):
-        text = text.replace(p, " ")
 
-    words = text.split()
-    return words
+def _applies_preprocessor(preprocessor, tokenizer):
+    """Whether the preprocessor has to be applied before the tokenizer.
+
+    The built-in tokenize already applies the (idempotent) built-in preprocess.
+    """
+    return bool(preprocessor) and not (
+        preprocessor is preprocess and tokenizer is tokenize
+    )
 
 
 def segment_generator(List, segment_size):
@@ -103,7 +164,7 @@ def segment_generator(List, segment_size):
         List of s lists of with r items in each list.
     """
     for i in range(0, len(List), segment_size):
-        yield List[i: i + segment_size]
+        yield List[i : i + segment_size]
 
 
 def list_sliding_window(sequence, window_size=2):
@@ -146,9 +207,506 @@ def list_sliding_window(sequence, window_size=2):
         yield result
 
 
+def encode_tokens(tokens):
+    """Intern a list of tokens into a vocabulary and an array of integer token ids.
+
+    Ids are assigned in order of first appearance, so vocab[token_ids[i]] == tokens[i]. The
+    tokens are encoded with a Vocabulary of their own.
+
+    Example:
+
+    encode_tokens(['a', 'b', 'a', 'c']) -> (array([0, 1, 0, 2], dtype=int32), ['a', 'b', 'c'])
+
+    Parameters
+    ----------
+    tokens: iterable
+        List of words.
+
+    Returns
+    -------
+    tuple
+        (numpy.ndarray of int32 token ids, list of terms indexed by id)
+    """
+    vocabulary = Vocabulary()
+    token_ids = vocabulary.encode(tokens)
+    return token_ids, list(vocabulary)
+
+
+class Vocabulary(object):
+    """Corpus-wide mapping of terms to stable integer ids, shared by many LexicalRichness objects.
+
+    Each distinct term is stored once, however many documents use it, and keeps its id for the
+    lifetime of the vocabulary. Documents built with LexicalRichness(text, vocabulary=vocab) are
+    stored as int32 id arrays into it, so a corpus held in memory costs 4 bytes per token plus
+    one string per distinct term, instead of a list of string objects per document.
+
+    Terms can be added from several threads. A vocabulary is shared within a process: a copy
+    sent to another process (e.g. pickled) grows independently.
+
+    Example:
+
+    vocab = Vocabulary()
+
+    docs = [LexicalRichness(text, vocabulary=vocab) for text in texts]
+
+    vocab.encode(['a', 'b', 'a']) -> array([0, 1, 0], dtype=int32)
+
+    Parameters
+    ----------
+    terms: iterable
+        Initial terms, given ids 0, 1, ... in order (default: none).
+    """
+
+    def __init__(self, terms=()):
+        self._terms = []
+        self._index = {}
+        self._lock = threading.Lock()
+        self.encode(list(terms))
+
+    def __getstate__(self):
+        return {"terms": self._terms}
+
+    def __setstate__(self, state):
+        self.__init__(state["terms"])
+
+    def encode(self, tokens):
+        """Ids of a list of tokens, adding the terms seen for the first time.
+
+        Parameters
+        ----------
+        tokens: iterable
+            List of words.
+
+        Returns
+        -------
+        numpy.ndarray
+            int32 token ids.
+        """
+        if not isinstance(tokens, list):
+            tokens = list(tokens)
+        # look up each distinct term of the list once in the shared index
+        local = dict.fromkeys(tokens)
+        index = self._index
+        with self._lock:
+            for term in local:
+                term_id = index.get(term)
+                if term_id is None:
+                    term_id = index[term] = len(self._terms)
+                    self._terms.append(term)
+                local[term] = term_id
+        return np.fromiter(
+            map(local.__getitem__, tokens), dtype=np.int32, count=len(tokens)
+        )
+
+    def decode(self, token_ids):
+        """Terms of an array of ids.
+
+        Parameters
+        ----------
+        token_ids: numpy.ndarray or list
+            Integer token ids.
+
+        Returns
+        -------
+        list
+        """
+        terms = self._terms
+        return [terms[i] for i in np.asarray(token_ids).tolist()]
+
+    def get(self, term, default=None):
+        """Id of a term, or default if the term is not in the vocabulary."""
+        return self._index.get(term, default)
+
+    def __getitem__(self, token_id):
+        return self._terms[token_id]
+
+    def __len__(self):
+        return len(self._terms)
+
+    def __iter__(self):
+        return iter(self._terms)
+
+    def __contains__(self, term):
+        return term in self._index
+
+    def __repr__(self):
+        return "Vocabulary(terms={})".format(len(self._terms))
+
+
+# Bytes at which a file can be split into chunks without splitting a token or a UTF-8 character
+_ASCII_WHITESPACE = (b" ", b"\n", b"\t", b"\r", b"\x0b", b"\x0c")
+
+
+def iter_text_chunks(path, chunk_size=2**20, encoding="utf-8"):
+    """Read a text file in chunks that end on whitespace, through a read-only memory map.
+
+    Each chunk is about chunk_size bytes and is cut after the last ASCII whitespace byte it
+    contains, so no token straddles two chunks. A chunk is extended until it contains whitespace
+    (or reaches the end of the file), so a token longer than chunk_size is still read whole.
+    Only one chunk is decoded at a time, and the file itself is paged in by the operating system.
+
+    Parameters
+    ----------
+    path: string or path-like
+        Path of the text file.
+    chunk_size: int
+        Approximate number of bytes per chunk (default=2**20, 1 MiB).
+    encoding: string
+        Encoding of the file (default="utf-8"). Must be ASCII-compatible, e.g. UTF-8 or Latin-1,
+        so that a whitespace byte is always a whitespace character.
+
+    Yields
+    ------
+    string
+        Decoded chunks of the file, in order.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer.")
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            start = 0
+            while start < size:
+                end = min(start + chunk_size, size)
+                while end < size:
+                    cut = max(
+                        data.rfind(space, start, end) for space in _ASCII_WHITESPACE
+                    )
+                    if cut >= start:
+                        end = cut + 1
+                        break
+                    end = min(end + chunk_size, size)
+                yield data[start:end].decode(encoding)
+                if hasattr(data, "madvise"):
+                    # let the kernel drop the pages read so far from the resident set
+                    data.madvise(mmap.MADV_DONTNEED, 0, end - end % mmap.PAGESIZE)
+                start = end
+
+
+def previous_occurrence(token_ids):
+    """Position of the previous occurrence of each token in an integer token id array.
+
+    Example:
+
+    previous_occurrence(np.array([0, 1, 0, 0])) -> array([-1, -1, 0, 2])
+
+    Parameters
+    ----------
+    token_ids: numpy.ndarray
+        Integer token ids.
+
+    Returns
+    -------
+    numpy.ndarray
+        For each position i, the largest j < i with token_ids[j] == token_ids[i], or -1 if the
+        token has not appeared before.
+    """
+    order = np.argsort(token_ids, kind="stable")
+    prev = np.full(len(token_ids), -1, dtype=np.int64)
+    same = token_ids[order[1:]] == token_ids[order[:-1]]
+    prev[order[1:][same]] = order[:-1][same]
+    return prev
+
+
+def sliding_window_distinct_counts(sequence, window_size, previous=None):
+    """Return the number of distinct items in every sliding window (of size window_size) over a sequence.
+
+    Equivalent to [len(set(window)) for window in list_sliding_window(sequence, window_size)], but
+    computed in linear time regardless of window size. For a list, a rolling count table is
+    updated as each window slides by one item: the entering item's count is incremented and the
+    leaving item's count decremented. For a NumPy array of integer token ids, the counts are
+    vectorized: a token at position i is new to every window that starts after its previous
+    occurrence, so each position adds one to a contiguous range of windows.
+
+    Example:
+
+    sliding_window_distinct_counts(['a', 'b', 'a', 'c'], 2) -> [2, 2, 2]
+
+    Parameters
+    ----------
+    sequence: sequence (list, tuple, numpy.ndarray of integer ids, etc.)
+        Sequence of hashable items to be iterated over.
+    window_size: int
+        Size of each window.
+    previous: numpy.ndarray or None
+        previous_occurrence(sequence), if already computed (NumPy arrays only).
+
+    Returns
+    -------
+    list or numpy.ndarray
+        Number of distinct items in each of the len(sequence) - window_size + 1 windows. A NumPy
+        array is returned if sequence is a NumPy array.
+    """
+    if isinstance(sequence, np.ndarray):
+        n_windows = len(sequence) - window_size + 1
+        if n_windows < 1:
+            return np.zeros(0, dtype=np.int64)
+        if previous is None:
+            previous = previous_occurrence(sequence)
+        positions = np.arange(len(sequence))
+        first_window = np.maximum(previous + 1, positions - window_size + 1)
+        last_window = np.minimum(positions, n_windows - 1)
+        valid = first_window <= last_window
+        increments = np.bincount(first_window[valid], minlength=n_windows + 1)
+        decrements = np.bincount(last_window[valid] + 1, minlength=n_windows + 1)
+        return np.cumsum(increments - decrements)[:n_windows]
+
+    counts = {}
+    distinct = 0
+    distinct_counts = []
+    for i, item in enumerate(sequence):
+        count = counts.get(item, 0)
+        if count == 0:
+            distinct += 1
+        counts[item] = count + 1
+
+        if i >= window_size:
+            leaving = sequence[i - window_size]
+            count = counts[leaving] - 1
+            counts[leaving] = count
+            if count == 0:
+                distinct -= 1
+
+        if i >= window_size - 1:
+            distinct_counts.append(distinct)
+    return distinct_counts
+
+
+def segment_distinct_counts(sequence, segment_size):
+    """Return the number of distinct items in each segment (of size segment_size) of a sequence.
+
+    Equivalent to [len(set(segment)) for segment in segment_generator(sequence, segment_size)].
+    The last segment holds the remaining len(sequence) % segment_size items if the sequence does
+    not divide evenly. A NumPy array of integer token ids is reshaped into one row per full
+    segment, the rows are sorted, and the distinct ids of every row are counted at once as the
+    number of changes of value along the row; the remainder segment is counted separately.
+
+    Parameters
+    ----------
+    sequence: sequence (list, tuple, numpy.ndarray of integer ids, etc.)
+        Sequence of hashable items to be segmented.
+    segment_size: int
+        Size of each segment.
+
+    Returns
+    -------
+    list or numpy.ndarray
+        Number of distinct items in each segment. A NumPy array is returned if sequence is a
+        NumPy array.
+    """
+    if isinstance(sequence, np.ndarray):
+        n_full = len(sequence) // segment_size
+        segments = np.sort(
+            sequence[: n_full * segment_size].reshape(n_full, segment_size)
+        )
+        distinct = 1 + np.count_nonzero(segments[:, 1:] != segments[:, :-1], axis=1)
+        remainder = sequence[n_full * segment_size :]
+        if len(remainder):
+            distinct = np.append(distinct, len(np.unique(remainder)))
+        return distinct
+
+    return [len(set(segment)) for segment in segment_generator(sequence, segment_size)]
+
+
+# Largest (subsamples x text length) boolean table used to track taken positions when sampling
+_SAMPLING_TABLE_CELLS = 2**20
+
+
+def _redraw_repeats(positions, population, rng):
+    """Redraw repeated positions within each row of positions (in place) until none are left.
+
+    Every repeat but its first occurrence is redrawn uniformly from [0, population). The
+    procedure only compares positions for equality, so it treats every position alike: rows drawn
+    uniformly with replacement become uniformly random ordered samples without replacement.
+    """
+    pending = np.arange(len(positions))
+    while True:
+        rows = positions[pending]
+        ordered = np.sort(rows, axis=1)
+        has_repeat = (ordered[:, 1:] == ordered[:, :-1]).any(axis=1)
+        if not has_repeat.any():
+            return positions
+        pending, rows = pending[has_repeat], rows[has_repeat]
+
+        # redraw all but the first occurrence of each repeated position
+        order = np.argsort(rows, axis=1, kind="stable")
+        ordered = rows[np.arange(len(rows))[:, None], order]
+        repeat_rows, repeat_cols = np.nonzero(ordered[:, 1:] == ordered[:, :-1])
+        redraw_cols = order[repeat_rows, repeat_cols + 1]
+        positions[pending[repeat_rows], redraw_cols] = (
+            rng.random(len(repeat_rows)) * population
+        ).astype(np.int64)
+
+
+def random_ordered_positions(population, n_samples, size, rng):
+    """Draw random ordered subsamples of positions 0, ..., population - 1 without replacement.
+
+    Every ordering of every subset is equally likely, so the first k positions of each row are
+    themselves a uniform random subsample of size k, for every k <= size. For short texts, the
+    rows are drawn by a partial Fisher-Yates shuffle, vectorized across rows, of a (n_samples x
+    population) table of positions. For long texts, positions are drawn with replacement and
+    repeats redrawn until none are left.
+
+    Parameters
+    ----------
+    population: int
+        Number of positions to sample from (the length of the text).
+    n_samples: int
+        Number of subsamples.
+    size: int
+        Size of each subsample. Must not be greater than population.
+    rng: numpy.random.Generator
+        Pseudo-random number generator used to draw the subsamples.
+
+    Returns
+    -------
+    numpy.ndarray
+        (n_samples, size) matrix of sampled positions.
+    """
+    if n_samples * population > _SAMPLING_TABLE_CELLS:
+        positions = (rng.random((n_samples, size)) * population).astype(np.int64)
+        return _redraw_repeats(positions, population, rng)
+
+    table = np.tile(np.arange(population, dtype=np.int64), (n_samples, 1))
+    rows = np.arange(n_samples)
+    # swaps[step] is uniform on [step, population)
+    swaps = np.arange(size)[:, None] + (
+        rng.random((size, n_samples)) * (population - np.arange(size))[:, None]
+    ).astype(np.int64)
+    for step in range(size):
+        swap = swaps[step]
+        drawn = table[rows, swap]
+        table[rows, swap] = table[:, step]
+        table[:, step] = drawn
+    return table[:, :size]
+
+
+def random_prefix_distinct_counts(token_ids, n_samples, size, rng):
+    """Number of distinct ids in every prefix of random ordered subsamples of a token id array.
+
+    Entry (i, k - 1) is the number of distinct ids among the first k tokens of subsample i, a
+    uniform random subsample of size k (see random_ordered_positions). One sort of the sampled
+    ids per row marks the first occurrence of each id, and a cumulative sum counts them, so the
+    distinct counts for all sizes up to size come from a single batch of subsamples.
+
+    Parameters
+    ----------
+    token_ids: numpy.ndarray
+        Integer token ids of the text.
+    n_samples: int
+        Number of subsamples.
+    size: int
+        Size of the longest prefix. Must not be greater than len(token_ids).
+    rng: numpy.random.Generator
+        Pseudo-random number generator used to draw the subsamples.
+
+    Returns
+    -------
+    numpy.ndarray
+        (n_samples, size) matrix of distinct counts.
+    """
+    sampled = token_ids[random_ordered_positions(len(token_ids), n_samples, size, rng)]
+    order = np.argsort(sampled, axis=1, kind="stable")
+    ordered = np.take_along_axis(sampled, order, axis=1)
+    first = np.ones(sampled.shape, dtype=np.int64)
+    first[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    # with a stable sort, the first of equal ids is the one that occurs first in the row
+    new = np.empty_like(first)
+    np.put_along_axis(new, order, first, axis=1)
+    return np.cumsum(new, axis=1)
+
+
+def spawn_generators(seed, n):
+    """Independent pseudo-random number generators split from one seed.
+
+    Generator k draws from child k of numpy.random.SeedSequence(seed), so its stream depends only
+    on seed and k. Work split across generators is therefore reproducible no matter how it is
+    scheduled across threads or processes. A SeedSequence given as seed is not modified (unlike
+    with SeedSequence.spawn), so the same object gives the same generators every time.
+
+    Parameters
+    ----------
+    seed: int, numpy.random.SeedSequence or None
+        Root seed. None draws fresh entropy from the operating system.
+    n: int
+        Number of generators.
+
+    Returns
+    -------
+    list of numpy.random.Generator
+    """
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return [
+        np.random.default_rng(
+            np.random.SeedSequence(
+                seed.entropy, spawn_key=seed.spawn_key + (k,), pool_size=seed.pool_size
+            )
+        )
+        for k in range(n)
+    ]
+
+
+# Largest (frequencies x draws) block of log-probability terms in hypergeom_absent_probability
+_CUMULATIVE_CELLS = 2**22
+
+
+def hypergeom_absent_probability(words, freq, draws):
+    """Probability that a term is absent from a random draw of tokens (without replacement).
+
+    Equal to scipy.stats.hypergeom.pmf(0, words, freq, draws) = C(words - freq, draws) /
+    C(words, draws), evaluated for every combination of freq and draws at once. The log
+    probability is accumulated as the sum over j < draws of log(1 - freq / (words - j)), which
+    is accurate to machine precision and gives every draw size up to max(draws) in one cumulative
+    sum. The sum runs over blocks of draws that keep memory bounded, with the running sum carried
+    from block to block, so a value does not depend on the other frequencies and draws asked for.
+    The cost is proportional to len(freq) * max(draws).
+
+    Parameters
+    ----------
+    words: int
+        Number of tokens in the text.
+    freq: array-like
+        Number of times each term appears in the text (1-dimensional).
+    draws: int or array-like
+        Number of tokens drawn. Must not be greater than words.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array of shape (len(freq),) + numpy.shape(draws).
+    """
+    freq = np.asarray(freq, dtype=np.float64)
+    draws = np.asarray(draws)
+    values, inverse = np.unique(draws, return_inverse=True)
+    max_draws = int(values[-1]) if values.size else 0
+    block = max(1, _CUMULATIVE_CELLS // max(len(freq), 1))
+
+    log_p = np.zeros((len(freq), len(values)))
+    running = np.zeros((len(freq), 1))
+    for start in range(0, max_draws, block):
+        stop = min(start + block, max_draws)
+        with np.errstate(divide="ignore"):
+            # terms that cannot be avoided have probability 0, i.e. log1p(-1) = -inf
+            ratio = np.minimum(freq[:, None] / (words - np.arange(start, stop)), 1.0)
+            # the running sum is the first element, so the additions are those of one long
+            # cumulative sum whatever the block size
+            cumulative = np.cumsum(
+                np.concatenate([running, np.log1p(-ratio)], axis=1), axis=1
+            )
+        # column k of cumulative is the log probability for start + k draws
+        in_block = (values >= start) & (values < stop)
+        log_p[:, in_block] = cumulative[:, values[in_block] - start]
+        running = cumulative[:, -1:]
+    log_p[:, values == max_draws] = running
+    return np.exp(log_p[:, inverse.reshape(draws.shape)])
+
+
 def ttr_nd(N, D):
     """McKee, Mavern, and Richard 2000's formulation of how the type token ratio (TTR) depends on the number of tokens (N) and a parameter D (a construct of the unobserved lexical diversity).
-    
+
     Predicted values of D is in the order of 10 to 100.
 
     Directly referenced from McKee, Mavern, and Richard 2000.
@@ -199,11 +757,261 @@ def frequency_wordfrequency_table(bow):
     return freq_i_N
 
 # fmt: on
-class LexicalRichness(object):
-    """Object containing tokenized text and methods to compute Lexical Richness (also known as Lexical Diversity or Vocabulary Diversity).
+# Attributes and measures of LexicalRichness that can be requested by name
+MEASURES = (
+    "words",
+    "terms",
+    "ttr",
+    "rttr",
+    "cttr",
+    "Herdan",
+    "Summer",
+    "Dugast",
+    "Maas",
+    "yulek",
+    "yulei",
+    "herdanvm",
+    "simpsond",
+    "msttr",
+    "mattr",
+    "mtld",
+    "hdd",
+    "vocd",
+)
+
+# Measures that are methods, and so take parameters
+METHODS = ("msttr", "mattr", "mtld", "hdd", "vocd")
+
+# Measures computed from the frequency spectrum
+_SPECTRUM_MEASURES = frozenset(["yulek", "yulei", "herdanvm", "simpsond", "hdd"])
+
+
+def _check_measures(measures, params, errors="raise"):
+    """Validate measure names, their parameters and the errors mode before any work is done."""
+    measures = list(measures)
+    unknown = [name for name in measures if name not in MEASURES]
+    if unknown:
+        raise ValueError(
+            "Unknown measure(s): {}. Choose from: {}.".format(
+                ", ".join(unknown), ", ".join(MEASURES)
+            )
+        )
+    params = dict(params or {})
+    for name in params:
+        if name not in measures:
+            raise ValueError(
+                "Parameters given for {!r}, which is not in measures.".format(name)
+            )
+        if name not in METHODS:
+            raise ValueError(
+                "{!r} is an attribute and does not take parameters.".format(name)
+            )
+    if errors not in ("raise", "coerce"):
+        raise ValueError(
+            "errors should be 'raise' or 'coerce', got {!r}.".format(errors)
+        )
+    return measures, params
+
+
+class FrequencySpectrum(object):
+    """Frequency spectrum of a text: how often each term occurs, and how many terms occur i times.
+
+    The spectrum is all that Yule's K, Yule's I, Herdan's Vm and Simpson's D need, so it is
+    computed once per text and shared between them. Unlike `frequency_wordfrequency_table`, it
+    is built from plain NumPy arrays and does not touch pandas.
+
+    Parameters
+    ----------
+    term_freq: dict
+        Mapping of term -> number of occurrences in the text (e.g. a collections.Counter).
+
+    Attributes
+    ----------
+    term_freq: dict
+        Mapping of term -> number of occurrences in the text.
+    freq: numpy.ndarray
+        Sorted distinct frequencies i with which terms appear in the text.
+    fv_i_N: numpy.ndarray
+        Number of terms that appear freq[j] times in the text.
+    sum_element: int
+        Sum over i of V(i, N) * i ** 2.
+    words: int
+        Number of words (tokens) in the text.
+    terms: int
+        Number of unique terms in the text.
     """
 
-    def __init__(self, text, preprocessor=preprocess, tokenizer=tokenize):
+    def __init__(self, term_freq):
+        self.term_freq = term_freq
+        counts = np.fromiter(term_freq.values(), dtype=np.int64, count=len(term_freq))
+        self._freq, self._fv_i_N = np.unique(counts, return_counts=True)
+        self._freq_of_freq = None
+        self._sum_element = int((self._fv_i_N * np.square(self._freq)).sum())
+        self.words = int(counts.sum())
+        self.terms = len(term_freq)
+
+    def _build_arrays(self):
+        """Rebuild freq and fv_i_N from the frequency-of-frequency counts kept by update."""
+        freq = sorted(self._freq_of_freq)
+        self._freq = np.array(freq, dtype=np.int64)
+        self._fv_i_N = np.array([self._freq_of_freq[i] for i in freq], dtype=np.int64)
+
+    @property
+    def freq(self):
+        """Sorted distinct frequencies i with which terms appear in the text."""
+        if self._freq is None:
+            self._build_arrays()
+        return self._freq
+
+    @property
+    def fv_i_N(self):
+        """Number of terms that appear freq[j] times in the text."""
+        if self._fv_i_N is None:
+            self._build_arrays()
+        return self._fv_i_N
+
+    def update(self, tokens):
+        """Add tokens to the spectrum in time proportional to the number of tokens added.
+
+        The term counts, the number of terms per frequency and sum_element are updated in place.
+        The freq and fv_i_N arrays are rebuilt on their next access.
+
+        Parameters
+        ----------
+        tokens: iterable
+            List of words to add.
+        """
+        if self._freq_of_freq is None:
+            self._freq_of_freq = dict(zip(self.freq.tolist(), self.fv_i_N.tolist()))
+        freq_of_freq = self._freq_of_freq
+        term_freq = self.term_freq
+
+        added = Counter(tokens)
+        for term, count in added.items():
+            old = term_freq.get(term, 0)
+            new = old + count
+            term_freq[term] = new
+            if old:
+                if freq_of_freq[old] == 1:
+                    del freq_of_freq[old]
+                else:
+                    freq_of_freq[old] -= 1
+            freq_of_freq[new] = freq_of_freq.get(new, 0) + 1
+            self._sum_element += new * new - old * old
+
+        self.words += sum(added.values())
+        self.terms = len(term_freq)
+        self._freq = self._fv_i_N = None
+
+    @classmethod
+    def from_ids(cls, token_ids):
+        """Build the spectrum from an array of integer token ids, keyed by id.
+
+        Only the ids that occur are counted, so the cost does not depend on the size of the
+        vocabulary the ids come from.
+
+        Parameters
+        ----------
+        token_ids: numpy.ndarray
+            Integer token ids.
+
+        Returns
+        -------
+        FrequencySpectrum
+        """
+        ids, counts = np.unique(token_ids, return_counts=True)
+        return cls(dict(zip(ids.tolist(), counts.tolist())))
+
+    @classmethod
+    def from_tokens(cls, tokens):
+        """Build the spectrum from an iterable of tokens.
+
+        Parameters
+        ----------
+        tokens: iterable
+            List of words.
+
+        Returns
+        -------
+        FrequencySpectrum
+        """
+        return cls(Counter(tokens))
+
+    def expected_terms(self, draws):
+        """Expected number of unique terms in a random draw of tokens (without replacement) from the text.
+
+        A term that appears i times is absent from a draw of n tokens with the hypergeometric
+        probability P(0; N, i, n). Terms with the same frequency are equally likely to be drawn, so
+        the expectation sums fv_i_N * (1 - P(0; N, i, n)) over the distinct frequencies in a
+        single vectorized evaluation rather than over every term. Each sum is correctly rounded,
+        so the value for a draw size does not depend on the other draw sizes asked for.
+
+        See Also
+        --------
+        hypergeom_absent_probability:
+            Probability that a term is absent from a random draw of tokens.
+
+        Parameters
+        ----------
+        draws: int or array-like
+            Number of tokens drawn. Must not be greater than the number of words in the text.
+
+        Returns
+        -------
+        numpy.ndarray
+            Expected number of unique terms for each value of draws.
+        """
+        draws = np.asarray(draws)
+        absent = hypergeom_absent_probability(self.words, self.freq, draws)
+        terms = self.fv_i_N[:, None] * (1 - absent.reshape(len(self.freq), -1))
+        return np.array([fsum(column) for column in terms.T.tolist()]).reshape(
+            draws.shape
+        )
+
+    @property
+    def sum_element(self):
+        """Sum over i of V(i, N) * i ** 2, the second moment used by Yule's K, Yule's I and Simpson's D.
+
+        Returns
+        -------
+        int
+        """
+        return self._sum_element
+
+    def __repr__(self):
+        return "FrequencySpectrum(words={}, terms={}, distinct_frequencies={})".format(
+            self.words, self.terms, len(self.freq)
+        )
+
+
+# repr and str show at most this many tokens, each cut to at most this many characters
+_PREVIEW_TOKENS = 10
+_PREVIEW_CHARS = 40
+_preview_repr = reprlib.Repr()
+_preview_repr.maxlist = _PREVIEW_TOKENS
+_preview_repr.maxstring = _PREVIEW_CHARS
+_preview_repr.maxother = _PREVIEW_CHARS
+
+# Number of tokens joined and written at a time by LexicalRichness.to_text
+_WRITE_CHUNK_TOKENS = 2**16
+
+
+class LexicalRichness(object):
+    """Object containing tokenized text and methods to compute Lexical Richness (also known as Lexical Diversity or Vocabulary Diversity)."""
+
+    # Intermediates shared by the measures computed together in report, set only on the private
+    # copy of the object that report computes them on (see _intermediate)
+    _intermediates = None
+
+    def __init__(
+        self,
+        text,
+        preprocessor=preprocess,
+        tokenizer=tokenize,
+        encode=False,
+        keep_tokens=True,
+        vocabulary=None,
+    ):
         """Initialise object with basic attributes needed to compute the common lexical diversity measures.
 
         Parameters
@@ -217,11 +1025,35 @@ class LexicalRichness(object):
         tokenizer: callable or None
             A callable for tokenizing the text. Default is the built-in
             `tokenize` function. If None, the text parameter should be a list.
+        encode: bool
+            If True, intern the tokens into a vocabulary and store the text as a NumPy int32 array
+            of token ids instead of a list of strings (default=False). This uses several times
+            less memory per token, and the windowed, segmental and sampling measures (msttr,
+            mattr, mtld, hdd, vocd) run on the integer ids. Results are the same either way.
+        keep_tokens: bool
+            If True (default), keep the tokens (as a list, or as an id array if encode=True). If
+            False, only keep the term counts (the frequency spectrum) and drop the tokens once they
+            are counted, e.g. to hold many scored documents in memory. The measures computed from
+            counts (ttr, rttr, cttr, Herdan, Summer, Dugast, Maas, yulek, yulei, herdanvm,
+            simpsond, hdd) are then available, and the order-dependent ones (msttr, mattr, mtld,
+            vocd) raise a ValueError. encode has no effect if keep_tokens is False.
+        vocabulary: Vocabulary or None
+            If given, encode the tokens as int32 ids of this vocabulary shared across documents
+            (implies encode=True), so that each distinct term is stored once for the whole
+            corpus. With keep_tokens=False, the term counts are keyed by id.
 
         Attributes
         ----------
-        wordlist: list
-            List of tokens from text.
+        wordlist: list or None
+            List of tokens from text. Rebuilt from token_ids and vocab on access if encode=True.
+            None if keep_tokens=False.
+        token_ids: numpy.ndarray or None
+            Integer token ids (int32) of the text if encode=True, else None.
+        vocab: list, Vocabulary or None
+            Terms indexed by token id if encode=True (the shared Vocabulary if vocabulary is
+            given), the distinct terms if keep_tokens=False, else None.
+        keep_tokens: bool
+            Whether the tokens are kept.
         words: int
             Number of words in text.
         terms: int
@@ -242,19 +1074,257 @@ class LexicalRichness(object):
         """
         self.preprocessor = preprocessor
         self.tokenizer = tokenizer
-
+        self.keep_tokens = keep_tokens
+        wordlist = self._tokenize(text)
+
+        self._spectrum = None
+        if vocabulary is not None:
+            self._wordlist = None
+            self.vocab = vocabulary
+            token_ids = vocabulary.encode(wordlist)
+            if keep_tokens:
+                self.token_ids = token_ids
+                self.words = len(token_ids)
+                self.terms = len(np.unique(token_ids))
+            else:
+                self.token_ids = None
+                self._spectrum = FrequencySpectrum.from_ids(token_ids)
+                self.words = self._spectrum.words
+                self.terms = self._spectrum.terms
+        elif not keep_tokens:
+            self._wordlist = None
+            self.token_ids = None
+            self._spectrum = FrequencySpectrum.from_tokens(wordlist)
+            self.vocab = list(self._spectrum.term_freq)
+            self.words = self._spectrum.words
+            self.terms = self._spectrum.terms
+        elif encode:
+            self._wordlist = None
+            self.token_ids, self.vocab = encode_tokens(wordlist)
+            self.words = len(self.token_ids)
+            self.terms = len(self.vocab)
+        else:
+            self._wordlist = wordlist
+            self.token_ids = None
+            self.vocab = None
+            self.words = len(wordlist)
+            self.terms = len(set(wordlist))
+
+    def _tokenize(self, text):
+        """Apply the preprocessor and tokenizer to text (or check that it is a list of words)."""
         if self.tokenizer:
-            if self.preprocessor:
+            if _applies_preprocessor(self.preprocessor, self.tokenizer):
                 text = self.preprocessor(text)
-            self.wordlist = self.tokenizer(text)
+            return self.tokenizer(text)
+
+        assert (
+            type(text) == list
+        ), "If tokenizer is None, then input should be a list of words."
+        return text
+
+    @classmethod
+    def from_file(
+        cls,
+        path,
+        preprocessor=preprocess,
+        tokenizer=tokenize,
+        keep_tokens=True,
+        chunk_size=2**20,
+        encoding="utf-8",
+    ):
+        """Analyze a text file that may be too large to hold in memory as a string.
+
+        The file is memory-mapped and tokenized in chunks of about chunk_size bytes that end on
+        whitespace (see iter_text_chunks), so the preprocessor and tokenizer must not produce
+        tokens that span whitespace, as the built-in ones do not. Tokens are interned into a
+        vocabulary chunk by chunk, so the full text, its preprocessed copy and its list of tokens
+        are never held in memory.
+
+        Example:
+
+        lex = LexicalRichness.from_file("corpus.txt", keep_tokens=False)
+
+        lex.words, lex.terms, lex.yulek
+
+        Parameters
+        ----------
+        path: string or path-like
+            Path of the text file.
+        preprocessor: callable or None
+            A callable for preprocessing each chunk. Default is the built-in `preprocess` function.
+        tokenizer: callable
+            A callable for tokenizing each chunk. Default is the built-in `tokenize` function.
+        keep_tokens: bool
+            If True (default), keep the text as an int32 array of token ids, as with encode=True,
+            so that every measure is available at 4 bytes per token. If False, only keep the term
+            counts: memory then depends on the size of the vocabulary and not of the file, and
+            only the measures computed from word and term counts (ttr, rttr, cttr, Herdan, Summer,
+            Dugast, Maas, yulek, yulei, herdanvm, simpsond, hdd) are available.
+        chunk_size: int
+            Approximate number of bytes read and tokenized at a time (default=2**20, 1 MiB).
+        encoding: string
+            Encoding of the file (default="utf-8"). Must be ASCII-compatible.
+
+        Returns
+        -------
+        LexicalRichness
+        """
+        if not tokenizer:
+            raise ValueError("A tokenizer is required to read text from a file.")
+        lex = cls.__new__(cls)
+        lex.preprocessor = preprocessor
+        lex.tokenizer = tokenizer
+        lex.keep_tokens = keep_tokens
+
+        vocabulary = Vocabulary()
+        id_chunks = []
+        term_freq = Counter()
+        for text in iter_text_chunks(path, chunk_size, encoding):
+            tokens = lex._tokenize(text)
+            if keep_tokens:
+                id_chunks.append(vocabulary.encode(tokens))
+            else:
+                term_freq.update(tokens)
+
+        lex._wordlist = None
+        if keep_tokens:
+            lex.token_ids = np.concatenate(id_chunks or [np.zeros(0, dtype=np.int32)])
+            lex.vocab = list(vocabulary)
+            lex._spectrum = None
         else:
-            assert (
-                type(text) == list
-            ), "If tokenizer is None, then input should be a list of words."
-            self.wordlist = text
+            lex.token_ids = None
+            lex.vocab = list(term_freq)
+            lex._spectrum = FrequencySpectrum(dict(term_freq))
+        lex.words = len(lex.token_ids) if keep_tokens else lex._spectrum.words
+        lex.terms = len(lex.vocab)
+        return lex
+
+    @classmethod
+    def _from_token_ids(cls, token_ids):
+        """Object for a text given as an array of integer token ids, e.g. of a Vocabulary shared
+        across documents whose terms are not at hand. The measures only compare terms for
+        equality, so each id stands for its own term (vocab maps every id to itself).
+        """
+        lex = cls.__new__(cls)
+        lex.preprocessor = None
+        lex.tokenizer = None
+        lex.keep_tokens = True
+        lex._wordlist = None
+        lex.token_ids = np.asarray(token_ids)
+        lex._spectrum = FrequencySpectrum.from_ids(lex.token_ids)
+        lex.vocab = range(int(lex.token_ids.max(initial=-1)) + 1)
+        lex.words = len(lex.token_ids)
+        lex.terms = lex._spectrum.terms
+        return lex
+
+    @property
+    def wordlist(self):
+        """List of tokens from text.
+
+        Returns
+        -------
+        list
+        """
+        if self._wordlist is None and self.token_ids is not None:
+            vocab = self.vocab
+            return [vocab[i] for i in self.token_ids.tolist()]
+        return self._wordlist
+
+    @wordlist.setter
+    def wordlist(self, wordlist):
+        self._wordlist = wordlist
+        self.token_ids = None
+        self.vocab = None
+        self._spectrum = None
+
+    def _check_tokens(self):
+        """Raise a ValueError if the object only keeps counts and not the tokens themselves."""
+        if self._wordlist is None and self.token_ids is None:
+            raise ValueError(
+                "The tokens are not kept (keep_tokens=False), so the text and the measures that "
+                "depend on the order of the tokens (msttr, mattr, mtld, vocd) are not available. "
+                "Only the measures computed from the term counts are: ttr, rttr, cttr, Herdan, "
+                "Summer, Dugast, Maas, yulek, yulei, herdanvm, simpsond, hdd."
+            )
+
+    def _tokens(self):
+        """Tokens in the representation the measures should run on: the integer id array if the
+        text is encoded, else the list of words.
+        """
+        self._check_tokens()
+        if self.token_ids is not None:
+            return self.token_ids
+        shared = self._intermediate("token_ids")
+        if shared is not None:
+            return shared
+        return self.wordlist
+
+    def _token_list(self):
+        """Tokens as a Python list (of ids if the text is encoded) for the measures that loop or
+        sample in Python.
+        """
+        self._check_tokens()
+        if self.token_ids is not None:
+            return self.token_ids.tolist()
+        return self.wordlist
+
+    def _token_id_array(self):
+        """Tokens as an integer id array, encoding the list of words if the text is not encoded."""
+        self._check_tokens()
+        if self.token_ids is not None:
+            return self.token_ids
+        shared = self._intermediate("token_ids")
+        if shared is not None:
+            return shared
+        return encode_tokens(self.wordlist)[0]
+
+    def _intermediate(self, name):
+        """Intermediate result shared by the measures that report computes together, or None."""
+        if self._intermediates is None:
+            return None
+        return self._intermediates.get(name)
+
+    @staticmethod
+    def _vocd_ttr_curve(token_ids, ntokens, within_sample, rng):
+        """Mean TTR of within_sample random subsamples for each subsample size 35, 36, ..., ntokens.
+
+        Steps 1 and 2 of vocd. within_sample random ordered subsamples of ntokens tokens are
+        drawn in one batch, and the subsamples of each smaller size are their prefixes.
+
+        Returns
+        -------
+        tuple
+            (list of subsample sizes, list of mean TTRs)
+        """
+        xdata = list(range(35, 1 + ntokens))
+        distinct = random_prefix_distinct_counts(token_ids, within_sample, ntokens, rng)
+        ydata = (distinct[:, 34:] / np.arange(35, 1 + ntokens)).mean(axis=0)
+        return xdata, ydata.tolist()
+
+    @property
+    def frequency_spectrum(self):
+        """Frequency spectrum of the text, computed on first access and cached on the object.
 
-        self.words = len(self.wordlist)
-        self.terms = len(set(self.wordlist))
+        See Also
+        --------
+        FrequencySpectrum:
+            Term frequencies and the number of terms that appear i times in the text.
+
+        Returns
+        -------
+        FrequencySpectrum
+        """
+        if self._spectrum is None:
+            if isinstance(self.vocab, Vocabulary):
+                self._spectrum = FrequencySpectrum.from_ids(self.token_ids)
+            elif self.token_ids is not None:
+                counts = np.bincount(self.token_ids, minlength=len(self.vocab))
+                self._spectrum = FrequencySpectrum(
+                    dict(zip(self.vocab, counts.tolist()))
+                )
+            else:
+                self._spectrum = FrequencySpectrum.from_tokens(self.wordlist)
+        return self._spectrum
 
     # Lexical richness measures as properties
     @property
@@ -361,16 +1431,15 @@ class LexicalRichness(object):
 
         See Also
         --------
-        frequency_wordfrequency_table:
-            Get table of i frequency and number of terms that appear i times in text of length N.
+        FrequencySpectrum:
+            Term frequencies and the number of terms that appear i times in the text.
 
         Returns
         -------
         Float
             Yule's K
         """
-        freq_i_N = frequency_wordfrequency_table(self.wordlist)
-        total_sum = freq_i_N.sum_element.sum()
+        total_sum = self.frequency_spectrum.sum_element
         k = (10**4) * (total_sum / self.words**2 - 1 / self.words)
         return k
 
@@ -380,17 +1449,17 @@ class LexicalRichness(object):
 
         See Also
         --------
-        frequency_wordfrequency_table:
-            Get table of i frequency and number of terms that appear i times in text of length N.
+        FrequencySpectrum:
+            Term frequencies and the number of terms that appear i times in the text.
 
         Returns
         -------
         Float
             Yule's I
         """
-        freq_i_N = frequency_wordfrequency_table(self.wordlist)
-        total_sum = freq_i_N.sum_element.sum()
-        i = self.terms**2 / (total_sum - self.terms)
+        total_sum = self.frequency_spectrum.sum_element
+        # NumPy division: inf (with a RuntimeWarning) if every term appears once
+        i = self.terms**2 / np.float64(total_sum - self.terms)
         return i
 
     @property
@@ -399,17 +1468,17 @@ class LexicalRichness(object):
 
         See Also
         --------
-        frequency_wordfrequency_table:
-            Get table of i frequency and number of terms that appear i times in text of length N.
+        FrequencySpectrum:
+            Term frequencies and the number of terms that appear i times in the text.
 
         Returns
         -------
         Float
             Herdan's Vm
         """
-        tab = frequency_wordfrequency_table(self.wordlist)
-        tab["sum_element"] = tab.fv_i_N * (tab.freq / self.words) ** 2
-        vm = np.sqrt(tab.sum_element.sum() - (1 / self.terms))
+        # sum over i of V(i, N) * (i / N) ** 2 = sum_element / N ** 2
+        total_sum = self.frequency_spectrum.sum_element / self.words**2
+        vm = np.sqrt(total_sum - (1 / self.terms))
         return vm
 
     @property
@@ -418,32 +1487,37 @@ class LexicalRichness(object):
 
         See Also
         --------
-        frequency_wordfrequency_table:
-            Get table of i frequency and number of terms that appear i times in text of length N.
+        FrequencySpectrum:
+            Term frequencies and the number of terms that appear i times in the text.
 
         Returns
         -------
         Float
             Simpson's D
         """
-        freq_i_N = frequency_wordfrequency_table(self.wordlist)
-        freq_i_N["sum_element"] = freq_i_N.fv_i_N * freq_i_N.freq * (freq_i_N.freq - 1)
-        total_sum = freq_i_N.sum_element.sum()
-        d = total_sum / (self.words * (self.words - 1))
+        # sum over i of V(i, N) * i * (i - 1) = sum_element - N
+        total_sum = self.frequency_spectrum.sum_element - self.words
+        # NumPy division: nan (with a RuntimeWarning) for fewer than two words
+        d = np.float64(total_sum) / (self.words * (self.words - 1))
         return d
 
     # Lexical richness measures as methods
-    def msttr(self, segment_window=100, discard=True):
-        """Mean segmental TTR (MSTTR) computed as average of TTR scores for segments in a text.
+    def msttr_profile(self, segment_window=100, discard=True):
+        """TTR of each successive segment of a text, as used by msttr.
 
-        Split a text into segments of length segment_window. For each segment, compute the TTR.
-        MSTTR score is the sum of these scores divided by the number of segments.
-        (Johnson 1944)
+        Split a text into segments of length segment_window and compute the TTR of each, from the
+        number of distinct tokens per segment.
+
+        Example:
+
+        profile = lex.msttr_profile(segment_window=25)
+
+        profile.argmin() -> index of the least diverse segment
 
         See Also
         --------
-        segment_generator:
-            Split a list into s segments of size r (segment_size).
+        segment_distinct_counts:
+            Number of distinct items in each segment of size r (segment_size).
 
         Parameters
         ----------
@@ -455,9 +1529,13 @@ class LexicalRichness(object):
 
         Returns
         -------
-        float
-            Mean segmental type-token ratio (MSTTR)
+        numpy.ndarray
+            TTR of each segment, in order.
         """
+        return self._segment_ttrs(self._tokens(), segment_window, discard)
+
+    def _segment_ttrs(self, tokens, segment_window, discard):
+        """TTR of each segment of tokens (see msttr_profile)."""
         if segment_window >= self.words:
             raise ValueError(
                 "Window size must be greater than text size of {}. Try a smaller segment_window size.".format(
@@ -468,32 +1546,81 @@ class LexicalRichness(object):
         if segment_window < 1 or isinstance(segment_window, float):
             raise ValueError("Window size must be a positive integer.")
 
-        scores = list()
-        for segment in segment_generator(self.wordlist, segment_window):
-            ttr = len(set(segment)) / len(segment)
-            scores.append(ttr)
+        distinct_counts = np.asarray(segment_distinct_counts(tokens, segment_window))
+        segment_starts = segment_window * np.arange(len(distinct_counts))
+        segment_lengths = np.minimum(segment_window, self.words - segment_starts)
+        scores = distinct_counts / segment_lengths
 
         if discard:  # discard remaining words
-            del scores[-1]
+            scores = scores[:-1]
+        return scores
+
+    def msttr(self, segment_window=100, discard=True):
+        """Mean segmental TTR (MSTTR) computed as average of TTR scores for segments in a text.
 
+        Split a text into segments of length segment_window. For each segment, compute the TTR.
+        MSTTR score is the sum of these scores divided by the number of segments.
+        (Johnson 1944)
+
+        See Also
+        --------
+        msttr_profile:
+            TTR of each successive segment of a text.
+
+        Example:
+
+        lex.msttr(segment_window=[25, 50, 100]) -> array([MSTTR(25), MSTTR(50), MSTTR(100)])
+
+        Parameters
+        ----------
+        segment_window: int or list of int
+            Size of each segment (default=100). Given a list of sizes, the text is encoded into
+            integer token ids once and the MSTTR is computed for every size.
+        discard: bool
+            If True, discard the remaining segment (e.g. for a text size of 105 and a segment_window
+            of 100, the last 5 tokens will be discarded). Default is True.
+
+        Returns
+        -------
+        float or numpy.ndarray
+            Mean segmental type-token ratio (MSTTR), for each size if segment_window is a list.
+        """
+        if np.ndim(segment_window):
+            token_ids = self._token_id_array()
+            return np.array(
+                [
+                    self._mean(self._segment_ttrs(token_ids, size, discard))
+                    for size in segment_window
+                ]
+            )
+        return self._mean(self.msttr_profile(segment_window, discard))
+
+    @staticmethod
+    def _mean(scores):
+        """Mean of an array of TTRs, summed in order as Python floats."""
+        scores = scores.tolist()
         if sys.version_info == 3:
             mean_ttr = mean(scores)
         else:
             mean_ttr = sum(scores) / len(scores)
         return mean_ttr
 
-    def mattr(self, window_size=100):
-        """Moving average TTR (MATTR) computed using the average of TTRs over successive segments
-        of a text.
+    def mattr_profile(self, window_size=100):
+        """TTR of every sliding window of a text, as used by mattr.
 
-        Estimate TTR for tokens 1 to n, 2 to n+1, 3 to n+2, and so on until the end
-        of the text (where n is window size), then take the average.
-        (Covington 2007, Covington and McFall 2010)
+        Window k covers tokens k + 1 to k + n (where n is window size), so a text of w words has
+        w - n + 1 windows. The distinct tokens per window are counted with a rolling kernel.
+
+        Example:
+
+        profile = lex.mattr_profile(window_size=50)
+
+        np.flatnonzero(profile < 0.6) -> start of every window with a TTR below 0.6
 
         See Also
         --------
-        list_sliding_window:
-            Returns a sliding window generator (of size window_size) over a sequence
+        sliding_window_distinct_counts:
+            Number of distinct items in every sliding window, computed with a rolling count table.
 
         Parameters
         ----------
@@ -502,9 +1629,10 @@ class LexicalRichness(object):
 
         Returns
         -------
-        float
-            Moving average type-token ratio (MATTR)
+        numpy.ndarray
+            TTR of each window, in order.
         """
+        self._check_tokens()
         if window_size > self.words:
             raise ValueError(
                 "Window size must not be greater than text size of {}. Try a smaller window size.".format(
@@ -515,17 +1643,35 @@ class LexicalRichness(object):
         if window_size < 1 or isinstance(window_size, float):
             raise ValueError("Window size must be a positive integer.")
 
-        scores = [
-            len(set(window)) / window_size
-            for window in list_sliding_window(self.wordlist, window_size)
-        ]
+        distinct_counts = sliding_window_distinct_counts(
+            self._tokens(), window_size, self._intermediate("previous")
+        )
+        return np.asarray(distinct_counts) / window_size
 
-        if sys.version_info == 3:
-            mattr = mean(scores)
-        else:
-            mattr = sum(scores) / len(scores)
+    def mattr(self, window_size=100):
+        """Moving average TTR (MATTR) computed using the average of TTRs over successive segments
+        of a text.
+
+        Estimate TTR for tokens 1 to n, 2 to n+1, 3 to n+2, and so on until the end
+        of the text (where n is window size), then take the average.
+        (Covington 2007, Covington and McFall 2010)
 
-        return mattr
+        See Also
+        --------
+        mattr_profile:
+            TTR of every sliding window of a text.
+
+        Parameters
+        ----------
+        window_size: int
+            Size of each sliding window.
+
+        Returns
+        -------
+        float
+            Moving average type-token ratio (MATTR)
+        """
+        return self._mean(self.mattr_profile(window_size))
 
     def mtld(self, threshold=0.72):
         """Measure of textual lexical diversity, computed as the mean length of sequential words in
@@ -562,9 +1708,9 @@ class LexicalRichness(object):
                 mtld measure (float)
             """
             if reverse:
-                word_iterator = iter(reversed(self.wordlist))
+                word_iterator = iter(reversed(tokens))
             else:
-                word_iterator = iter(self.wordlist)
+                word_iterator = iter(tokens)
 
             terms = set()
             word_counter = 0
@@ -593,8 +1739,9 @@ class LexicalRichness(object):
                 else:
                     factor_count += (1 - ttr) / (1 - threshold)
 
-            return len(self.wordlist) / factor_count
+            return self.words / factor_count
 
+        tokens = self._token_list()
         forward_measure = sub_mtld(self, threshold, reverse=False)
         reverse_measure = sub_mtld(self, threshold, reverse=True)
 
@@ -614,43 +1761,59 @@ class LexicalRichness(object):
         each term t. Described in McCarthy and Javis 2007, p.g. 465-466.
         (McCarthy and Jarvis 2007)
 
+        Terms that appear the same number of times contribute the same amount, so p is computed
+        once per distinct frequency and weighted by the number of terms with that frequency.
+
+        See Also
+        --------
+        FrequencySpectrum.expected_terms:
+            Expected number of unique terms in a random draw of tokens from the text.
+
         Parameters
         ----------
-        draws: int
-            Number of random draws in the hypergeometric distribution (default=42).
+        draws: int or array-like of int
+            Number of random draws in the hypergeometric distribution (default=42). An array of
+            draws computes HD-D for every sample size in one call.
 
         Returns
         -------
-        float
-            Hypergeometric distribution diversity (HD-D) score
+        float or numpy.ndarray
+            Hypergeometric distribution diversity (HD-D) score, or an array of scores with the
+            shape of draws.
         """
         if self.terms < 42:
             suggestion = self.words // 2
         else:
             suggestion = 42
-        if self.words < draws:
+        draws_array = np.asarray(draws)
+        if (draws_array > self.words).any():
             raise ValueError(
                 "Number of draws should be less than the total sample size of {0}. Try a draw value smaller than {0}, e.g. hdd(draws={1}.)".format(
                     self.words, suggestion
                 )
             )
-        if draws < 1 or isinstance(draws, float):
+        if (
+            isinstance(draws, float)
+            or not np.issubdtype(draws_array.dtype, np.integer)
+            or (draws_array < 1).any()
+        ):
             raise ValueError(
                 "Number of draws must be a positive integer. E.g. hdd(draws={})".format(
                     suggestion
                 )
             )
 
-        term_freq = Counter(self.wordlist)
+        return (self.frequency_spectrum.expected_terms(draws_array) / draws_array)[()]
 
-        term_contributions = [
-            (1 - hypergeom.pmf(0, self.words, freq, draws)) / draws
-            for _, freq in term_freq.items()
-        ]
-
-        return sum(term_contributions)
-
-    def vocd(self, ntokens=50, within_sample=100, iterations=3, seed=42):
+    def vocd(
+        self,
+        ntokens=50,
+        within_sample=100,
+        iterations=3,
+        seed=42,
+        method="sampling",
+        n_jobs=1,
+    ):
         """Vocd score of lexical diversity derived from a series of TTR samplings and curve fittings.
 
         Vocd is meant as a measure of lexical diversity robust to varying text lengths. See also hdd.
@@ -669,10 +1832,18 @@ class LexicalRichness(object):
         Step 4: Repeat steps 1 to 3 for x number (default=3) of times before averaging D, which is the
         returned value.
 
+        With method="analytic", steps 1, 2 and 4 are replaced by the exact expected TTR of a random
+        sample of 35, 36, ..., ntokens words, computed from the term frequencies with
+        hypergeometric probabilities (the same quantity hdd uses). The result is deterministic,
+        and its cost depends on the number of distinct term frequencies rather than on
+        within_sample and iterations, which are ignored along with seed.
+
         See Also
         --------
         ttr_nd
             TTR as a function of latent lexical diversity (d) and text length (n).
+        FrequencySpectrum.expected_terms
+            Expected number of unique terms in a random draw of tokens from the text.
 
         Parameters
         ----------
@@ -682,40 +1853,55 @@ class LexicalRichness(object):
             Number of samples for each token/word size (default=100).
         iterations: int
             Number of times to repeat steps 1 to 3 before averaging (default=3).
-        seed: int
-            Seed for the pseudo-random number generator in ramdom.sample() (default=42).
+        seed: int or numpy.random.SeedSequence
+            Seed of the random samples (default=42). Iteration k draws from its own generator,
+            child k of numpy.random.SeedSequence(seed) (see spawn_generators), so the result
+            does not depend on n_jobs.
+        method: string
+            "sampling" (default) to estimate the TTR curve from random samples, or "analytic" to
+            compute its expected value exactly.
+        n_jobs: int
+            Number of threads to run the iterations on (default=1). -1 uses every CPU.
 
         Returns
         -------
         float
             voc-D
         """
+        self._check_tokens()
         try:
             assert self.words > ntokens
         except Exception:
             raise ValueError(
                 "Number of tokens in text smaller than number of tokens to sample."
             )
+        if method not in ("sampling", "analytic"):
+            raise ValueError(
+                "method should be 'sampling' or 'analytic', got {!r}.".format(method)
+            )
 
-        random.seed(seed)
-        adapted_d = []
-        for _ in range(iterations):
-            mean_ttr_results = []
-            for ntoken in range(35, 1 + ntokens):
-                ttr_results = []
-                for _ in range(within_sample):
-                    sample_of_tokens = random.sample(self.wordlist, k=ntoken)
-                    n_unique = len(set(sample_of_tokens))
-                    ttr = n_unique / ntoken
-                    ttr_results.append(ttr)
-                mean_ttr = np.mean(ttr_results)
-                mean_ttr_results.append(mean_ttr)
+        if method == "analytic":
+            xdata = np.arange(35, 1 + ntokens)
+            ydata = self.frequency_spectrum.expected_terms(xdata) / xdata
+            popt, _ = _optimize.curve_fit(ttr_nd, xdata, ydata)
+            return popt[0]
+
+        token_ids = self._token_id_array()
+
+        def adapted_d(rng):
+            # Steps 1 and 2
+            xdata, ydata = self._vocd_ttr_curve(token_ids, ntokens, within_sample, rng)
             # Step 3
-            xdata = list(range(35, 1 + ntokens))
-            ydata = mean_ttr_results
-            popt, _ = curve_fit(ttr_nd, xdata, ydata)
-            adapted_d.append(popt[0])
-        return np.mean(adapted_d)
+            popt, _ = _optimize.curve_fit(ttr_nd, xdata, ydata)
+            return popt[0]
+
+        rngs = spawn_generators(seed, iterations)
+        if n_jobs == -1:
+            n_jobs = os.cpu_count() or 1
+        if n_jobs > 1 and iterations > 1:
+            with ThreadPoolExecutor(max_workers=min(n_jobs, iterations)) as executor:
+                return np.mean(list(executor.map(adapted_d, rngs)))
+        return np.mean([adapted_d(rng) for rng in rngs])
 
     def vocd_fig(
         self,
@@ -761,8 +1947,9 @@ class LexicalRichness(object):
             Number of samples for each token/word size (default=100).
         iterations: int
             Number of times to repeat steps 1 to 3 before averaging (default=3).
-        seed: int
-            Seed for the pseudo-random number generator in ramdom.sample() (default=42).
+        seed: int or numpy.random.SeedSequence
+            Seed of the random samples (default=42). The curve is that of the first iteration of
+            vocd with the same seed.
         return_data: boolean
             If True, returns a tuple (figure, xvalues, empirical_TTR, fitted_TTR). Default is False.
             xvalues, empirical_TTR, and fitted_TTR are lists of numbers.
@@ -771,6 +1958,7 @@ class LexicalRichness(object):
         -------
         matplotlib.figure.Figure
         """
+        self._check_tokens()
         try:
             assert self.words > ntokens
         except Exception:
@@ -778,26 +1966,12 @@ class LexicalRichness(object):
                 "Number of tokens in text smaller than number of tokens to sample."
             )
 
-        random.seed(seed)
-        ydata = []
-        for ntoken in range(35, 1 + ntokens):
-            ttr_results = []
-            for _ in range(within_sample):
-                sample_of_tokens = random.sample(self.wordlist, k=ntoken)
-
-                n_unique = len(set(sample_of_tokens))
-
-                ttr = n_unique / ntoken
-
-                ttr_results.append(ttr)
-
-            mean_ttr = np.mean(ttr_results)
-            ydata.append(mean_ttr)
-
-        xdata = list(range(35, 1 + ntokens))
-        assert len(xdata) == len(ydata)
+        (rng,) = spawn_generators(seed, 1)
+        xdata, ydata = self._vocd_ttr_curve(
+            self._token_id_array(), ntokens, within_sample, rng
+        )
 
-        popt, _ = curve_fit(ttr_nd, xdata, ydata)
+        popt, _ = _optimize.curve_fit(ttr_nd, xdata, ydata)
 
         # Plot
         _, ax = plt.subplots(figsize=figsize, facecolor="white")
@@ -837,15 +2011,261 @@ class LexicalRichness(object):
         else:
             return ax
 
+    def report(self, measures=None, errors="raise", **params):
+        """Compute several measures at once, sharing the work they have in common.
+
+        The intermediates needed by the requested measures are computed once and reused: the
+        frequency spectrum (yulek, yulei, herdanvm, simpsond, hdd), the integer token id array
+        (msttr, mattr, vocd, encoding the text if it is not encoded) and the position of the
+        previous occurrence of each token (mattr). Results are the same as computing each measure
+        on its own.
+
+        Example:
+
+        lex.report(["ttr", "mattr", "hdd"], mattr={"window_size": 50}) ->
+            {"ttr": ..., "mattr": ..., "hdd": ...}
+
+        Parameters
+        ----------
+        measures: list of string or None
+            Names of the attributes and measures to compute (see MEASURES). Default is all.
+        errors: string
+            "raise" (default) to propagate errors such as a text shorter than the mattr window, or
+            "coerce" to return NaN for the measures that could not be computed.
+        **params: dict
+            Keyword arguments for the measures that are methods, keyed by measure name, e.g.
+            mattr={"window_size": 50}, hdd={"draws": 30}.
+
+        Returns
+        -------
+        dict
+            Measure name -> value, in the order of measures.
+        """
+        measures, params = _check_measures(
+            MEASURES if measures is None else measures, params, errors
+        )
+
+        intermediates = {}
+        if self._wordlist is not None or self.token_ids is not None:
+            token_ids = self.token_ids
+            if token_ids is None and {"msttr", "mattr", "vocd"}.intersection(measures):
+                token_ids, _ = encode_tokens(self._wordlist)
+                intermediates["token_ids"] = token_ids
+            if token_ids is not None and "mattr" in measures:
+                intermediates["previous"] = previous_occurrence(token_ids)
+
+        if _SPECTRUM_MEASURES.intersection(measures):
+            # computed on the object itself, so that it stays cached after the report
+            self.frequency_spectrum
+
+        # the measures run on a shallow copy holding the intermediates, so that the object (which
+        # may be shared, e.g. by a ResultCache) is never modified by a report
+        view = copy.copy(self)
+        view._intermediates = intermediates
+        values = {}
+        for name in measures:
+            try:
+                value = getattr(view, name)
+                if name in METHODS:
+                    value = value(**params.get(name, {}))
+            except Exception:
+                if errors == "raise":
+                    raise
+                value = np.nan
+            values[name] = value
+        return values
+
+    def _iter_token_chunks(self, size):
+        """Yield the tokens as lists of at most size terms, without building the whole list."""
+        self._check_tokens()
+        if self.token_ids is None:
+            for start in range(0, len(self._wordlist), size):
+                yield self._wordlist[start : start + size]
+            return
+        vocab = self.vocab
+        for start in range(0, len(self.token_ids), size):
+            yield [vocab[i] for i in self.token_ids[start : start + size].tolist()]
+
+    def _preview(self):
+        """First tokens shown by repr and str (one more than shown, to tell that the text goes
+        on), or None if the tokens are not kept.
+        """
+        if self._wordlist is None and self.token_ids is None:
+            return None
+        return next(self._iter_token_chunks(_PREVIEW_TOKENS + 1), [])
+
+    def to_text(self, file=None, sep=" "):
+        """Reconstruct the text from its tokens, or stream it to a file.
+
+        str and repr only show the first few tokens; this is the explicit way to get the whole
+        text. When writing to a file, the tokens are joined and written a block at a time, so the
+        text is never held in memory as one string.
+
+        Example:
+
+        with open("tokens.txt", "w") as f:
+
+            lex.to_text(f)
+
+        Parameters
+        ----------
+        file: file-like object or None
+            Text file (opened for writing) to write the text to. If None (default), the text is
+            returned as a string.
+        sep: string
+            Separator written between tokens (default=" ").
+
+        Returns
+        -------
+        string or None
+            The text if file is None, else None.
+        """
+        if file is None:
+            return sep.join(
+                sep.join(tokens)
+                for tokens in self._iter_token_chunks(_WRITE_CHUNK_TOKENS)
+            )
+        for i, tokens in enumerate(self._iter_token_chunks(_WRITE_CHUNK_TOKENS)):
+            if i:
+                file.write(sep)
+            file.write(sep.join(tokens))
+
     def __str__(self):
-        return " ".join(self.wordlist)
+        preview = self._preview()
+        if preview is None:
+            return "<{} words, tokens not kept>".format(self.words)
+        text = " ".join(
+            str(token)[:_PREVIEW_CHARS] for token in preview[:_PREVIEW_TOKENS]
+        )
+        if len(preview) > _PREVIEW_TOKENS:
+            text += " ..."
+        return text
 
     def __repr__(self):
-        return 'LexicalRichness(words={}, terms={}, preprocessor={}, tokenizer={}, wordlist={}, string="{}")'.format(
-            self.words,
-            self.terms,
-            self.preprocessor,
-            self.tokenizer,
-            self.wordlist,
-            " ".join(self.wordlist),
+        preview = self._preview()
+        return (
+            "{}(words={}, terms={}, preprocessor={}, tokenizer={}, wordlist={})".format(
+                type(self).__name__,
+                self.words,
+                self.terms,
+                self.preprocessor,
+                self.tokenizer,
+                "<not kept>" if preview is None else _preview_repr.repr(preview),
+            )
         )
+
+
+class IncrementalLexicalRichness(LexicalRichness):
+    """LexicalRichness for text that arrives in pieces, updated in place as each chunk is added.
+
+    Word and term counts and the frequency spectrum are kept up to date by update(), so ttr,
+    rttr, cttr, Herdan, Summer, Dugast, Maas, yulek, yulei, herdanvm and simpsond are available
+    after every chunk at a cost proportional to the size of the chunk rather than of the whole
+    text.
+
+    Each chunk is tokenized on its own, so chunks should break between words (e.g. one chat
+    message per chunk).
+
+    Example:
+
+    lex = IncrementalLexicalRichness()
+
+    lex.update("first message of the session")
+
+    lex.update("and a second message")
+
+    lex.words, lex.terms -> (9, 8)
+
+    Parameters
+    ----------
+    text: string or list
+        Initial text, or a list of tokens if tokenizer is None (default="", no text).
+    preprocessor: callable or None
+        A callable for preprocessing each chunk. Default is the built-in `preprocess` function.
+    tokenizer: callable or None
+        A callable for tokenizing each chunk. Default is the built-in `tokenize` function. If
+        None, every chunk should be a list of words.
+    keep_tokens: bool
+        If True (default), also keep the list of tokens seen so far so that the order-dependent
+        measures (msttr, mattr, mtld, vocd) can be computed. If False, only the counts are
+        kept and memory stays proportional to the vocabulary.
+    """
+
+    def __init__(
+        self, text="", preprocessor=preprocess, tokenizer=tokenize, keep_tokens=True
+    ):
+        self.preprocessor = preprocessor
+        self.tokenizer = tokenizer
+        self.keep_tokens = keep_tokens
+        self.token_ids = None
+        self.vocab = None
+        self._wordlist = [] if keep_tokens else None
+        self._spectrum = FrequencySpectrum({})
+        self.words = 0
+        self.terms = 0
+        if text:
+            self.update(text)
+
+    @classmethod
+    def from_file(
+        cls,
+        path,
+        preprocessor=preprocess,
+        tokenizer=tokenize,
+        keep_tokens=True,
+        chunk_size=2**20,
+        encoding="utf-8",
+    ):
+        """Start from the contents of a text file, read in chunks through a memory map.
+
+        Further text can then be added with update(). See LexicalRichness.from_file.
+
+        Returns
+        -------
+        IncrementalLexicalRichness
+        """
+        if not tokenizer:
+            raise ValueError("A tokenizer is required to read text from a file.")
+        lex = cls(
+            preprocessor=preprocessor, tokenizer=tokenizer, keep_tokens=keep_tokens
+        )
+        for text in iter_text_chunks(path, chunk_size, encoding):
+            lex.update(text)
+        return lex
+
+    def update(self, chunk):
+        """Add a chunk of text to the object.
+
+        Parameters
+        ----------
+        chunk: string or list
+            Text to append, or a list of tokens if tokenizer is None.
+
+        Returns
+        -------
+        IncrementalLexicalRichness
+            The object itself, so that calls can be chained.
+        """
+        tokens = self._tokenize(chunk)
+        # fetch the spectrum first: after a wordlist reassignment it is rebuilt from
+        # the old tokens only
+        spectrum = self.frequency_spectrum
+        if self.keep_tokens:
+            self._wordlist.extend(tokens)
+        spectrum.update(tokens)
+        self.words = self._spectrum.words
+        self.terms = self._spectrum.terms
+        return self
+
+    @property
+    def frequency_spectrum(self):
+        """Frequency spectrum of the text seen so far, updated in place by update().
+
+        Returns
+        -------
+        FrequencySpectrum
+        """
+        if self._spectrum is None:
+            # wordlist was reassigned: rebuild the counts from it
+            self._spectrum = FrequencySpectrum.from_tokens(self._wordlist)
+        return self._spectrum
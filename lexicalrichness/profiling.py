@@ -0,0 +1,338 @@
+"""Opt-in timing of the stages and measures of LexicalRichness."""
+
+#  -*-  coding:  utf-8  -*-
+import functools
+import threading
+import time
+
+from . import lexicalrichness as _lr
+from .lexicalrichness import IncrementalLexicalRichness, LexicalRichness
+
+# Properties and methods of LexicalRichness timed as measures, with the number of words in the
+# text as their token count
+MEASURES = (
+    "ttr",
+    "rttr",
+    "cttr",
+    "Herdan",
+    "Summer",
+    "Dugast",
+    "Maas",
+    "yulek",
+    "yulei",
+    "herdanvm",
+    "simpsond",
+    "msttr",
+    "msttr_profile",
+    "mattr",
+    "mattr_profile",
+    "mtld",
+    "hdd",
+    "vocd",
+    "vocd_fig",
+)
+
+# Profilers currently recording, and the class attributes replaced while any of them is
+_active = []
+_patches = []
+_patch_lock = threading.Lock()
+
+# Per-thread stack of the time spent in the stages nested inside each running stage
+_nested = threading.local()
+
+
+def _words(args, result):
+    """Token count of a method call: the number of words of the object it was called on."""
+    return args[0].words
+
+
+def _length(args, result):
+    """Token count of a tokenizer call: the number of tokens it returned."""
+    return len(result)
+
+
+def _timed(stage, func, count=None):
+    """Wrap func so that each call is recorded as stage by every active Profiler.
+
+    Parameters
+    ----------
+    stage: string
+        Name under which the calls are recorded.
+    func: callable
+        Function to time.
+    count: callable or None
+        count(args, result) -> number of tokens processed by the call, or None to record none.
+
+    Returns
+    -------
+    callable
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profilers = list(_active)
+        if not profilers:
+            return func(*args, **kwargs)
+
+        stack = _nested.__dict__.setdefault("stack", [])
+        stack.append(0.0)
+        tokens = 0
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+            if count is not None:
+                tokens = count(args, result)
+            return result
+        finally:
+            seconds = time.perf_counter() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += seconds
+            for profiler in profilers:
+                profiler._record(stage, seconds, seconds - nested, tokens)
+
+    return wrapper
+
+
+def _result_words(args, result):
+    """Token count of a constructor call: the number of words of the object it returned."""
+    return result.words
+
+
+def _tokenize(self, text):
+    """LexicalRichness._tokenize with the preprocessor and tokenizer timed as separate stages."""
+    if not self.tokenizer:
+        return _original_tokenize(self, text)
+    if _lr._applies_preprocessor(self.preprocessor, self.tokenizer):
+        text = _timed("preprocessor", self.preprocessor)(text)
+    return _timed("tokenizer", self.tokenizer, _length)(text)
+
+
+_original_tokenize = LexicalRichness._tokenize
+
+# (attribute name, stage, token count) of the other timed attributes of both classes
+_STAGES = [
+    ("__init__", "init", _words),
+    ("from_file", "from_file", _result_words),
+    ("update", "update", None),
+    ("frequency_spectrum", "frequency_spectrum", _words),
+    ("_vocd_ttr_curve", "vocd_sampling", None),
+] + [(name, name, _words) for name in MEASURES]
+
+
+class _TimedModule(object):
+    """Module proxy that times the calls to some of its functions."""
+
+    def __init__(self, module, stages):
+        self._module = module
+        self._stages = stages
+
+    def __getattr__(self, name):
+        attr = getattr(self._module, name)
+        if name in self._stages:
+            return _timed(self._stages[name], attr)
+        return attr
+
+
+def _timed_attribute(attr, stage, count):
+    """Timed version of a function, property, staticmethod or classmethod class attribute."""
+    if isinstance(attr, property):
+        return property(
+            _timed(stage, attr.fget, count), attr.fset, attr.fdel, attr.__doc__
+        )
+    if isinstance(attr, (staticmethod, classmethod)):
+        return type(attr)(_timed(stage, attr.__func__, count))
+    return _timed(stage, attr, count)
+
+
+def _instrumented():
+    """(owner, attribute name, replacement) for every attribute timed while profiling."""
+    replacements = [
+        (LexicalRichness, "_tokenize", _tokenize),
+        (_lr, "_optimize", _TimedModule(_lr._optimize, {"curve_fit": "curve_fit"})),
+    ]
+    for owner in (LexicalRichness, IncrementalLexicalRichness):
+        for name, stage, count in _STAGES:
+            if name in vars(owner):
+                attr = _timed_attribute(vars(owner)[name], stage, count)
+                replacements.append((owner, name, attr))
+    return replacements
+
+
+def _activate(profiler):
+    """Start recording into profiler, instrumenting LexicalRichness if no profiler was active."""
+    with _patch_lock:
+        if profiler in _active:
+            return
+        if not _active:
+            for owner, name, replacement in _instrumented():
+                _patches.append((owner, name, vars(owner)[name]))
+                setattr(owner, name, replacement)
+        _active.append(profiler)
+
+
+def _deactivate(profiler):
+    """Stop recording into profiler, restoring LexicalRichness once no profiler is active."""
+    with _patch_lock:
+        if profiler not in _active:
+            return
+        _active.remove(profiler)
+        if not _active:
+            while _patches:
+                owner, name, original = _patches.pop()
+                setattr(owner, name, original)
+
+
+class Profiler(object):
+    """Record wall time, call counts and token throughput of each stage and measure of LexicalRichness.
+
+    While a Profiler is active, the construction of LexicalRichness and IncrementalLexicalRichness
+    objects and every measure computed on them, in any thread, are recorded under these stages:
+
+    init: the whole of __init__, including the stages below (its own time is the counting of
+        words and terms)
+    preprocessor, tokenizer: the preprocessor and tokenizer calls (the built-in tokenize includes
+        the built-in preprocess, so preprocessor is not recorded for the default pair)
+    frequency_spectrum: access to the frequency spectrum (built on first access)
+    ttr, ..., vocd: each property and method (see MEASURES)
+    vocd_sampling, curve_fit: the subsampling and curve fitting steps of vocd and vocd_fig
+    from_file, update: LexicalRichness.from_file and IncrementalLexicalRichness.update
+
+    The stages are timed by wrappers that are installed on the classes when the first Profiler
+    starts and removed when the last one stops, so LexicalRichness runs unchanged, at no cost,
+    when no Profiler is active.
+
+    Example:
+
+    with Profiler() as prof:
+
+        for text in texts:
+
+            LexicalRichness(text).mtld()
+
+    prof.to_dict()["tokenizer"] -> {"calls": ..., "seconds": ..., "own_seconds": ..., ...}
+
+    Attributes
+    ----------
+    active: bool
+        Whether the profiler is recording.
+    """
+
+    def __init__(self):
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    @property
+    def active(self):
+        return self in _active
+
+    def start(self):
+        """Start recording. Recording can be stopped and restarted; records accumulate.
+
+        Returns
+        -------
+        Profiler
+            The profiler itself.
+        """
+        _activate(self)
+        return self
+
+    def stop(self):
+        """Stop recording."""
+        _deactivate(self)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _record(self, stage, seconds, own_seconds, tokens, calls=1):
+        with self._lock:
+            record = self._stages.setdefault(stage, [0, 0.0, 0.0, 0])
+            record[0] += calls
+            record[1] += seconds
+            record[2] += own_seconds
+            record[3] += tokens
+
+    def merge(self, other):
+        """Add the records of another profiler, e.g. one that ran in a worker process.
+
+        Parameters
+        ----------
+        other: Profiler or dict
+            A Profiler, or the output of its to_dict().
+
+        Returns
+        -------
+        Profiler
+            The profiler itself.
+        """
+        if isinstance(other, Profiler):
+            other = other.to_dict()
+        for stage, values in other.items():
+            self._record(
+                stage,
+                values["seconds"],
+                values["own_seconds"],
+                values["tokens"],
+                values["calls"],
+            )
+        return self
+
+    def reset(self):
+        """Discard all records."""
+        with self._lock:
+            self._stages = {}
+
+    def to_dict(self):
+        """Records as a plain dict that can be serialized to JSON or pickled.
+
+        Returns
+        -------
+        dict
+            Stage name -> {"calls", "seconds" (total wall time), "own_seconds" (excluding the
+            stages nested inside it), "tokens" (total tokens processed) and "tokens_per_second"
+            (None if the stage processes no tokens)}, in the order stages were first recorded.
+        """
+        with self._lock:
+            stages = {stage: list(record) for stage, record in self._stages.items()}
+        return {
+            stage: {
+                "calls": calls,
+                "seconds": seconds,
+                "own_seconds": own_seconds,
+                "tokens": tokens,
+                "tokens_per_second": tokens / seconds if tokens and seconds else None,
+            }
+            for stage, (calls, seconds, own_seconds, tokens) in stages.items()
+        }
+
+    def report(self):
+        """Records as a table, sorted by total time.
+
+        Returns
+        -------
+        string
+        """
+        rows = sorted(self.to_dict().items(), key=lambda item: -item[1]["seconds"])
+        lines = [
+            "{:<20} {:>10} {:>12} {:>12} {:>14}".format(
+                "stage", "calls", "seconds", "own seconds", "tokens/s"
+            )
+        ]
+        for stage, values in rows:
+            throughput = values["tokens_per_second"]
+            lines.append(
+                "{:<20} {:>10} {:>12.6f} {:>12.6f} {:>14}".format(
+                    stage,
+                    values["calls"],
+                    values["seconds"],
+                    values["own_seconds"],
+                    "{:,.0f}".format(throughput) if throughput else "",
+                )
+            )
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return "Profiler(active={}, stages={})".format(self.active, list(self._stages))
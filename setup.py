@@ -25,6 +25,9 @@ setup(
         "Programming Language :: Python :: 3.9",
         "Programming Language :: Python :: 3.10",
     ],
+    entry_points={
+        "console_scripts": ["lexicalrichness=lexicalrichness.cli:main"],
+    },
     description="A small module to compute textual lexical richness (aka lexical diversity).",
     install_requires=requirements,
     license="MIT license",
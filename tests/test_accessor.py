@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `lexicalrichness.accessor`."""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from lexicalrichness import LexicalRichness
+from lexicalrichness.accessor import LexicalRichnessAccessor
+
+
+class TestAccessor(unittest.TestCase):
+    """Tests for the pandas Series accessor."""
+
+    def setUp(self):
+        self.series = pd.Series(
+            [
+                "TEST text with some text numbers 42, hyphen-here, and text punctuations.",
+                "only unique terms in this little string",
+                ["already", "tokenized", "tokens", "tokens"],
+            ],
+            index=["x", "y", "z"],
+        )
+
+    def test_measures(self):
+        assert isinstance(self.series.lex, LexicalRichnessAccessor)
+        result = self.series.lex.measures(
+            ["words", "ttr", "mattr", "hdd"], mattr={"window_size": 3}, hdd={"draws": 3}
+        )
+        assert isinstance(result, pd.DataFrame)
+        assert list(result.columns) == ["words", "ttr", "mattr", "hdd"]
+        assert list(result.index) == ["x", "y", "z"]
+
+        for key, text in self.series.items():
+            if isinstance(text, list):
+                lex = LexicalRichness(text, preprocessor=None, tokenizer=None)
+            else:
+                lex = LexicalRichness(text)
+            self.assertEqual(result.loc[key, "words"], lex.words)
+            self.assertEqual(result.loc[key, "ttr"], lex.ttr)
+            self.assertEqual(result.loc[key, "mattr"], lex.mattr(window_size=3))
+            self.assertEqual(result.loc[key, "hdd"], lex.hdd(draws=3))
+
+    def test_token_rows(self):
+        # later rows are encoded as ids that do not start at 0
+        texts = [self.series["x"], self.series["y"], self.series["x"] + " more words"]
+        rows = pd.Series([LexicalRichness(text).wordlist for text in texts])
+        measures = [
+            "words",
+            "terms",
+            "ttr",
+            "yulek",
+            "herdanvm",
+            "msttr",
+            "mattr",
+            "mtld",
+        ]
+        params = {"msttr": {"segment_window": 3}, "mattr": {"window_size": 3}}
+        for n_jobs in (1, 2):
+            result = rows.lex.measures(measures, n_jobs=n_jobs, **params)
+            for i, tokens in rows.items():
+                lex = LexicalRichness(tokens, preprocessor=None, tokenizer=None)
+                expected = lex.report(measures, **params)
+                assert result.loc[i].tolist() == [expected[m] for m in measures]
+
+    def test_parallel(self):
+        series = pd.concat([self.series] * 10, ignore_index=True)
+        serial = series.lex.measures(["ttr", "mtld"])
+        parallel = series.lex.measures(["ttr", "mtld"], n_jobs=2, chunksize=4)
+        pd.testing.assert_frame_equal(serial, parallel)
+
+    def test_missing_values(self):
+        series = pd.Series(["some text here", np.nan])
+        result = series.lex.measures(["ttr"], errors="coerce")
+        assert result["ttr"].isna().tolist() == [False, True]
+
+    def test_encode(self):
+        token_ids, vocab = pd.Series(["a b a", "b c", ["c", "d"]]).lex.encode()
+        assert vocab == ["a", "b", "c", "d"]
+        assert [ids.tolist() for ids in token_ids] == [[0, 1, 0], [1, 2], [2, 3]]
+
+        tokens = self.series.lex.tokens()
+        assert tokens["x"] == LexicalRichness(self.series["x"]).wordlist
+        # each distinct term is stored once across rows
+        assert tokens["x"][1] is tokens["x"][4]
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `lexicalrichness.aio`."""
+
+import asyncio
+import threading
+import time
+import unittest
+
+import pytest
+
+from lexicalrichness import LexicalRichness, tokenize
+from lexicalrichness.aio import AsyncLexicalRichness
+
+
+class SlowTokenizer(object):
+    """Tokenizer that sleeps on texts containing "slow" and records how many calls overlap.
+
+    If gate is set to a threading.Event, it waits for the event (for at most seconds) instead.
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.gate = None
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+        self.texts = []
+
+    def __call__(self, text):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            self.texts.append(text)
+        try:
+            if "slow" in text:
+                if self.gate is None:
+                    time.sleep(self.seconds)
+                else:
+                    self.gate.wait(self.seconds)
+            return tokenize(text)
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+class TestAsyncLexicalRichness(unittest.TestCase):
+    """Tests for the asyncio API."""
+
+    def setUp(self):
+        self.text = (
+            "The quick brown fox jumps over the lazy dog and the quick cat. " * 5
+        )
+
+    def test_score(self):
+        async def main():
+            async with AsyncLexicalRichness(max_workers=2) as alex:
+                return await alex.score(
+                    self.text, ["words", "ttr", "mtld", "vocd"], {"vocd": {"seed": 1}}
+                )
+
+        lex = LexicalRichness(self.text)
+        scores = asyncio.run(main())
+        assert scores == {
+            "words": lex.words,
+            "ttr": lex.ttr,
+            "mtld": lex.mtld(),
+            "vocd": lex.vocd(seed=1),
+        }
+
+        with pytest.raises(ValueError):
+            AsyncLexicalRichness(executor="fiber")
+
+    def test_concurrency(self):
+        tokenizer = SlowTokenizer(0.02)
+
+        async def main():
+            async with AsyncLexicalRichness(
+                max_workers=4, max_concurrency=2, tokenizer=tokenizer
+            ) as alex:
+                texts = ["slow text number {}".format(i) for i in range(8)]
+                return await asyncio.gather(*(alex.score(text) for text in texts))
+
+        scores = asyncio.run(main())
+        assert len(scores) == 8
+        assert tokenizer.max_running == 2
+
+    def test_timeout_and_cancel(self):
+        # slow documents block until their gate is set, so the test does not depend on timing
+        tokenizer = SlowTokenizer(30)
+
+        async def running(n):
+            while tokenizer.running != n:
+                await asyncio.sleep(0.001)
+
+        async def main():
+            async with AsyncLexicalRichness(
+                max_workers=2, tokenizer=tokenizer, timeout=30
+            ) as alex:
+                # a slow document times out without holding up the other requests
+                tokenizer.gate = threading.Event()
+                slow = asyncio.ensure_future(alex.score("slow document", timeout=0.05))
+                fast = await alex.score("fast document", ["words"])
+                assert fast == {"words": 2}
+                with pytest.raises(asyncio.TimeoutError):
+                    await slow
+                tokenizer.gate.set()
+                await running(0)
+
+                # a request waiting for a slot is dropped when cancelled
+                tokenizer.gate = threading.Event()
+                blockers = [asyncio.ensure_future(alex.score("slow")) for _ in range(2)]
+                await running(2)
+                queued = asyncio.ensure_future(alex.score("never scored"))
+                await asyncio.sleep(0)
+                queued.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await queued
+                tokenizer.gate.set()
+                await asyncio.gather(*blockers)
+
+        asyncio.run(main())
+        assert "never scored" not in tokenizer.texts
+
+
+if __name__ == "__main__":
+    unittest.main()
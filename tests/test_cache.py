@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `lexicalrichness.cache`."""
+
+import functools
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import numpy as np
+import pytest
+
+import lexicalrichness.cache
+from lexicalrichness import DiskCache, LexicalRichness, ResultCache, batch, preprocess
+
+
+def helper(text):
+    return text.lower()
+
+
+def _split_words(text):
+    return helper(text).split()
+
+
+class TestDiskCache(unittest.TestCase):
+    """Tests for the on-disk cache of tokenized documents."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = DiskCache(self.tmpdir.name)
+        self.text = "Café au lait, naïve text with some text and more text. " * 10
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_load(self):
+        lex = LexicalRichness(self.text)
+        first = self.cache.load(self.text)
+        cached = self.cache.load(self.text)
+        assert (self.cache.hits, self.cache.misses) == (1, 1)
+        assert isinstance(cached.token_ids, np.memmap)
+
+        assert cached.wordlist == lex.wordlist
+        for measure in ["words", "terms", "ttr", "yulek", "herdanvm"]:
+            self.assertEqual(getattr(cached, measure), getattr(lex, measure))
+            self.assertEqual(getattr(first, measure), getattr(lex, measure))
+        self.assertEqual(cached.mattr(window_size=10), lex.mattr(window_size=10))
+        self.assertEqual(cached.mtld(), lex.mtld())
+        self.assertEqual(cached.hdd(draws=20), lex.hdd(draws=20))
+
+        counts_only = self.cache.load(self.text, keep_tokens=False)
+        self.assertEqual(counts_only.yulei, lex.yulei)
+        with pytest.raises(ValueError):
+            counts_only.mtld()
+
+        empty = self.cache.load("")
+        assert self.cache.load("").words == empty.words == 0
+
+        with pytest.raises(TypeError):
+            self.cache.load(["a", "list"])
+
+    def test_key(self):
+        key = self.cache.key(self.text)
+        assert key == DiskCache(self.tmpdir.name).key(self.text)
+        assert key != self.cache.key(self.text + " ")
+        assert key != self.cache.key(self.text, preprocessor=None)
+        assert key != self.cache.key(self.text, tokenizer=str.split)
+
+        self.cache.load(self.text, tokenizer=str.split)
+        self.cache.load(self.text)
+        assert self.cache.misses == 2
+
+    def test_key_identity(self):
+        # a redefined function with the same name and bytecode but another constant
+        def tok(text):
+            return text.split(",")
+
+        first = self.cache.key("a,b;c", None, tok)
+        assert self.cache.load("a,b;c", None, tok).wordlist == ["a", "b;c"]
+
+        def tok(text):
+            return text.split(";")
+
+        assert self.cache.key("a,b;c", None, tok) != first
+        assert self.cache.load("a,b;c", None, tok).wordlist == ["a,b", "c"]
+
+        # default arguments, closure contents and helper functions are part of the key
+        def split_on(sep):
+            def tok(text, lower=False):
+                return helper(text).split(sep)
+
+            return tok
+
+        keys = {
+            self.cache.key("x", None, split_on(",")),
+            self.cache.key("x", None, split_on(";")),
+        }
+        assert len(keys) == 2
+        assert self.cache.key("x", None, _split_words) == self.cache.key(
+            "x", None, _split_words
+        )
+
+        for tokenizer in [lambda text: text.split(), functools.partial(str.split)]:
+            with pytest.raises(TypeError, match="cache_key"):
+                self.cache.load("a b", None, tokenizer)
+            with pytest.raises(TypeError):
+                batch(["a b"], ["words"], tokenizer=tokenizer, cache=self.cache)
+            lex = self.cache.load("a b", None, tokenizer, cache_key="split")
+            assert lex.wordlist == ["a", "b"]
+        assert self.cache.key("x", cache_key="a") != self.cache.key("x", cache_key="b")
+
+    def test_key_identity_memoized(self):
+        # only the text is hashed per document, the functions once per cache object
+        with mock.patch(
+            "lexicalrichness.cache._callable_identity",
+            wraps=lexicalrichness.cache._callable_identity,
+        ) as identity:
+            for text in ["first text", "second text", "first text"]:
+                self.cache.load(text, None, _split_words)
+            batch(
+                ["third text"] * 3,
+                ["words"],
+                preprocessor=None,
+                tokenizer=_split_words,
+                cache=self.cache,
+            )
+            assert identity.call_count == 2
+            self.cache.load("first text", preprocess, _split_words)
+            assert identity.call_count == 4
+
+    def test_key_across_processes(self):
+        code = (
+            "import re\n"
+            "from lexicalrichness import DiskCache\n"
+            "WORD = re.compile(r'\\w+')\n"
+            "STOP = {'a', 'the', 'of'}\n"
+            "def tok(text):\n"
+            "    return [w for w in WORD.findall(text) if w not in STOP | {'an'}]\n"
+            "print(DiskCache(%r).key('a text', None, tok))\n" % self.tmpdir.name
+        )
+        keys = set()
+        for hash_seed in ["1", "2"]:
+            out = subprocess.run(
+                [sys.executable, "-c", code],
+                check=True,
+                stdout=subprocess.PIPE,
+                universal_newlines=True,
+                env=dict(os.environ, PYTHONHASHSEED=hash_seed),
+            )
+            keys.add(out.stdout.strip())
+        assert len(keys) == 1
+
+    def test_eviction(self):
+        self.cache.load(self.text)
+        max_bytes = 3 * self.cache.size()
+        cache = DiskCache(self.tmpdir.name, max_bytes=max_bytes)
+        for i in range(10):
+            cache.load(self.text + str(i))
+        assert 0 < cache.size() <= max_bytes
+        # the most recently used document is kept
+        assert os.path.exists(cache._path(cache.key(self.text + "9")))
+
+        cache.clear()
+        assert cache.size() == 0
+
+    def test_batch(self):
+        texts = [self.text, "only unique terms in this little string", self.text]
+        measures = ["words", "ttr", "mattr", "mtld"]
+        params = {"mattr": {"window_size": 3}}
+        expected = batch(texts, measures, params)
+        for _ in range(2):
+            result = batch(texts, measures, params, cache=self.cache)
+            for name in measures:
+                assert result[name].tolist() == expected[name].tolist()
+        assert (self.cache.hits, self.cache.misses) == (4, 2)
+
+
+class TestResultCache(unittest.TestCase):
+    """Tests for the in-process LRU cache of tokenized texts and results."""
+
+    def setUp(self):
+        self.cache = ResultCache()
+        self.text = "Café au lait, naïve text with some text and more text. " * 10
+        self.lex = LexicalRichness(self.text)
+
+    def test_score(self):
+        cases = [
+            ("ttr", {}),
+            ("mtld", {"threshold": 0.7}),
+            ("hdd", {"draws": np.array([10, 20])}),
+            ("vocd", {"seed": 1}),
+            ("msttr", {"segment_window": [10, 25]}),
+        ]
+        for measure, params in cases:
+            expected = getattr(self.lex, measure)
+            if callable(expected):
+                expected = expected(**params)
+            for _ in range(2):
+                value = self.cache.score(self.text, measure, **params)
+                assert np.array_equal(value, expected)
+
+        stats = self.cache.stats()
+        assert stats["misses"] == 5  # the text and the 4 methods
+        assert stats["hits"] == 9 + 4  # the text after its first load, the 4 methods
+        assert stats["entries"] == 5 and stats["bytes"] > 0
+
+        # positional and keyword arguments share an entry, unseeded vocd is never cached
+        lex = self.cache.load(self.text)
+        assert lex is self.cache.load(self.text)
+        self.assertEqual(lex.mtld(0.7), lex.mtld(threshold=0.7))
+        lex.vocd(seed=None)
+        assert self.cache.stats()["entries"] == 5
+
+        with pytest.raises(ValueError):
+            self.cache.score(self.text, "ttr", draws=3)
+
+    def test_tokenizer_objects(self):
+        # tokenizers that differ only in a constant, which share a name and bytecode
+        comma, semicolon = lambda t: t.split(","), lambda t: t.split(";")
+        assert self.cache.load("a,b;c", None, comma).wordlist == ["a", "b;c"]
+        assert self.cache.load("a,b;c", None, semicolon).wordlist == ["a,b", "c"]
+        assert self.cache.score("a,b;c", "words", None, comma) == 2
+
+        split_on = [functools.partial(str.split, sep=sep) for sep in ",;"]
+        lexes = [self.cache.load("a,b;c", None, tok) for tok in split_on]
+        assert [lex.wordlist for lex in lexes] == [["a", "b;c"], ["a,b", "c"]]
+
+    def test_eviction(self):
+        texts = [self.text + str(i) for i in range(10)]
+        self.cache.load(texts[0])
+        max_bytes = 3 * self.cache.stats()["bytes"]
+        cache = ResultCache(max_bytes=max_bytes)
+        for text in texts:
+            cache.score(text, "mtld")
+        stats = cache.stats()
+        assert 0 < stats["bytes"] <= max_bytes and stats["evictions"] > 0
+        cache.score(texts[-1], "mtld")
+        assert cache.stats()["hits"] == 2  # the text and its result
+
+        cache.clear()
+        assert len(cache) == 0 and cache.stats()["misses"] == 0
+
+    def test_threads(self):
+        texts = [self.text + str(i % 5) for i in range(200)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            values = list(
+                executor.map(lambda text: self.cache.score(text, "mtld"), texts)
+            )
+        for text, value in zip(texts, values):
+            self.assertEqual(value, LexicalRichness(text).mtld())
+        stats = self.cache.stats()
+        assert stats["hits"] + stats["misses"] == 400
+        assert stats["entries"] == 10
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `lexicalrichness.cli`."""
+
+import csv
+import json
+import os
+import random
+import string
+import tempfile
+import unittest
+
+import pytest
+
+from lexicalrichness import LexicalRichness
+from lexicalrichness.cli import BadDocument, iter_documents, main
+
+
+class TestCli(unittest.TestCase):
+    """Tests for the command-line interface."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.dir = self.tmpdir.name
+        self.texts = {
+            "a.txt": "one two three two",
+            os.path.join("sub", "b.txt"): "alpha beta beta gamma",
+        }
+        os.makedirs(self.path("corpus", "sub"))
+        for name, text in self.texts.items():
+            with open(self.path("corpus", name), "w") as f:
+                f.write(text)
+        with open(self.path("corpus", "skipped.md"), "w") as f:
+            f.write("not a txt file")
+        with open(self.path("rows.jsonl"), "w") as f:
+            f.write('{"key": 7, "body": "x y z x"}\n\n{"key": 8, "body": "hello"}\n')
+        with open(self.path("rows.csv"), "w") as f:
+            f.write('key,body\n1,"some, text here"\n')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def path(self, *names):
+        return os.path.join(self.dir, *names)
+
+    def read_jsonl(self, path):
+        with open(path) as f:
+            return [json.loads(line) for line in f]
+
+    def test_iter_documents(self):
+        corpus = self.path("corpus")
+        documents = list(
+            iter_documents(
+                [corpus, self.path("rows.jsonl"), self.path("rows.csv")],
+                text_column="body",
+            )
+        )
+        assert documents == [
+            (self.path("corpus", "a.txt"), "one two three two"),
+            (self.path("corpus", "sub", "b.txt"), "alpha beta beta gamma"),
+            (self.path("rows.jsonl") + ":1", "x y z x"),
+            (self.path("rows.jsonl") + ":2", "hello"),
+            (self.path("rows.csv") + ":1", "some, text here"),
+        ]
+        documents = iter_documents([self.path("rows.csv")], "lines")
+        assert [text for _, text in documents] == ["key,body", '1,"some, text here"']
+
+    def test_jsonl(self):
+        output = self.path("scores.jsonl")
+        argv = [self.path("rows.jsonl"), "--text-column", "body", "--id-column", "key"]
+        argv += ["-m", "words", "ttr", "mattr", "-p", "mattr.window_size=2"]
+        assert main(argv + ["-o", output]) == 0
+
+        records = self.read_jsonl(output)
+        lex = LexicalRichness("x y z x")
+        assert records[0] == {
+            "id": "7",
+            "words": 4,
+            "ttr": lex.ttr,
+            "mattr": lex.mattr(window_size=2),
+        }
+        # a measure that cannot be computed is written as null
+        assert records[1] == {"id": "8", "words": 1, "ttr": 1.0, "mattr": None}
+
+        with pytest.raises(SystemExit):
+            main(argv + ["-p", "mtld.threshold=0.7"])
+
+    def test_csv_resume(self):
+        output = self.path("scores.csv")
+        argv = [self.path("corpus"), "-m", "words", "terms", "-o", output]
+        assert main(argv) == 0
+        with open(output) as f:
+            expected = f.read()
+
+        # an interrupted run: the first row and part of the second
+        with open(output, "w") as f:
+            f.write(expected[: expected.index("b.txt") + 3])
+        assert main(argv + ["--resume", "--jobs", "2", "--chunksize", "1"]) == 0
+        with open(output) as f:
+            assert f.read() == expected
+
+        rows = list(csv.DictReader(expected.splitlines()))
+        assert [row["words"] for row in rows] == ["4", "4"]
+
+        with pytest.raises(SystemExit):
+            main([self.path("corpus"), "-m", "ttr", "-o", output, "--resume"])
+
+    def test_resume_seed(self):
+        rng = random.Random(0)
+        terms = [a + b for a in string.ascii_lowercase for b in "aeiou"]
+        with open(self.path("long.jsonl"), "w") as f:
+            for _ in range(4):
+                text = " ".join(
+                    rng.choice(terms[: rng.randint(20, 120)]) for _ in range(80)
+                )
+                f.write(json.dumps({"body": text}) + "\n")
+        output = self.path("scores.jsonl")
+        argv = [self.path("long.jsonl"), "--text-column", "body", "-m", "vocd"]
+        argv += ["--seed", "1", "-o", output]
+        assert main(argv) == 0
+        with open(output) as f:
+            expected = f.readlines()
+        assert len(set(expected)) == 4
+
+        # the resumed documents get the vocd samples of the uninterrupted run
+        with open(output, "w") as f:
+            f.writelines(expected[:2])
+        assert main(argv + ["--resume"]) == 0
+        with open(output) as f:
+            assert f.readlines() == expected
+
+    def test_bad_rows(self):
+        path = self.path("bad.jsonl")
+        with open(path, "w") as f:
+            f.write('{"key": 1, "body": "a b a"}\n{"body": "no id"}\n[1, 2]\n')
+            f.write('{not json\n{"key": 5, "text": "no body"}\n')
+        output = self.path("scores.jsonl")
+        argv = [path, "--text-column", "body", "--id-column", "key", "-m", "words"]
+        assert main(argv + ["-o", output]) == 0
+        # a row without a text is scored as null, and identified by its row if it has no id
+        assert self.read_jsonl(output) == [
+            {"id": "1", "words": 3},
+            {"id": path + ":2", "words": None},
+            {"id": path + ":3", "words": None},
+            {"id": path + ":4", "words": None},
+            {"id": "5", "words": None},
+        ]
+
+        with pytest.raises(SystemExit):
+            main(argv + ["-o", output, "--errors", "raise"])
+        with pytest.raises(BadDocument, match="bad.jsonl:2: no 'key' field"):
+            list(iter_documents([path], text_column="body", id_column="key"))
+
+        for option in [["--jobs", "0"], ["--chunksize", "0"]]:
+            with pytest.raises(SystemExit):
+                main(argv + option)
+
+
+if __name__ == "__main__":
+    unittest.main()
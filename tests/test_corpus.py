@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `lexicalrichness.corpus`."""
+
+import unittest
+
+import numpy as np
+import pytest
+
+from lexicalrichness import LexicalRichness, batch, iter_batch
+
+
+class TestCorpus(unittest.TestCase):
+    """Tests for the batch corpus API."""
+
+    def setUp(self):
+        self.texts = [
+            "TEST text with some text numbers 42, hyphen-here, and text punctuations.",
+            "only unique terms in this little string",
+            ["already", "tokenized", "tokens", "tokens"],
+        ]
+
+    def test_batch(self):
+        result = batch(
+            self.texts,
+            measures=["words", "ttr", "mattr", "mtld"],
+            params={"mattr": {"window_size": 3}},
+        )
+        assert list(result) == ["words", "ttr", "mattr", "mtld"]
+        assert result["words"].tolist() == [10, 7, 4]
+
+        for i, text in enumerate(self.texts):
+            if isinstance(text, list):
+                lex = LexicalRichness(text, preprocessor=None, tokenizer=None)
+            else:
+                lex = LexicalRichness(text)
+            self.assertEqual(result["ttr"][i], lex.ttr)
+            self.assertEqual(result["mattr"][i], lex.mattr(window_size=3))
+            self.assertEqual(result["mtld"][i], lex.mtld())
+
+    def test_batch_parallel(self):
+        texts = (self.texts[i % 3] for i in range(30))
+        serial = batch(
+            list(texts), measures=["ttr", "hdd"], params={"hdd": {"draws": 3}}
+        )
+        texts = (self.texts[i % 3] for i in range(30))
+        parallel = batch(
+            texts,
+            measures=["ttr", "hdd"],
+            params={"hdd": {"draws": 3}},
+            n_jobs=2,
+            chunksize=4,
+        )
+        for name in serial:
+            np.testing.assert_array_equal(serial[name], parallel[name])
+
+    def test_batch_seed(self):
+        rng = np.random.default_rng(0)
+        texts = [
+            ["w{}".format(rank) for rank in rng.zipf(1.5, size=300).tolist()]
+            for _ in range(6)
+        ]
+        texts.append(texts[0])
+        params = {"vocd": {"iterations": 1}}
+        serial = batch(texts, ["vocd"], params, seed=7)["vocd"]
+        parallel = batch(texts, ["vocd"], params, n_jobs=2, chunksize=2, seed=7)["vocd"]
+        np.testing.assert_array_equal(serial, parallel)
+        # each document draws from its own random stream
+        assert serial[0] != serial[-1]
+        # numbered documents keep their stream when scored apart from the others
+        rest = iter_batch(
+            enumerate(texts[3:], 3), ["vocd"], params, seed=7, indexed=True
+        )
+        assert [row["vocd"] for row in rest] == serial[3:].tolist()
+
+        unseeded = batch(texts, ["vocd"], params)["vocd"]
+        assert unseeded[0] == unseeded[-1]
+        lex = LexicalRichness(texts[0], preprocessor=None, tokenizer=None)
+        assert unseeded[0] == lex.vocd(iterations=1)
+
+    def test_batch_as_frame(self):
+        df = batch(self.texts, measures=["terms", "ttr"], as_frame=True)
+        assert df.columns.tolist() == ["terms", "ttr"]
+        assert len(df) == 3
+
+    def test_errors(self):
+        with pytest.raises(ZeroDivisionError):
+            batch(["", "some text"], measures=["ttr"])
+
+        result = batch(["", "some text"], measures=["ttr"], errors="coerce")
+        assert np.isnan(result["ttr"][0])
+        assert result["ttr"][1] == 1
+
+        with pytest.raises(ValueError):
+            batch(self.texts, measures=["nonexistent"])
+        with pytest.raises(ValueError):
+            batch(self.texts, measures=["ttr"], params={"ttr": {"draws": 3}})
+        with pytest.raises(ValueError):
+            batch(self.texts, measures=["mtld"], params={"hdd": {"draws": 3}})
+
+    def test_iter_batch(self):
+        rows = iter_batch(iter(self.texts), measures=["words"])
+        assert next(rows) == {"words": 10}
+        assert [row["words"] for row in rows] == [7, 4]
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,21 +3,39 @@
 
 """Tests for `lexicalrichness` package."""
 
-
+import io
+import math
+import os
+import subprocess
+import sys
+import tempfile
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
 import matplotlib
 import numpy as np
 import pytest
 
 from lexicalrichness.lexicalrichness import (
+    FrequencySpectrum,
+    IncrementalLexicalRichness,
     LexicalRichness,
+    encode_tokens,
     frequency_wordfrequency_table,
+    hypergeom_absent_probability,
+    iter_text_chunks,
     list_sliding_window,
     preprocess,
+    previous_occurrence,
+    random_ordered_positions,
+    random_prefix_distinct_counts,
+    segment_distinct_counts,
     segment_generator,
+    sliding_window_distinct_counts,
+    spawn_generators,
     tokenize,
     ttr_nd,
+    Vocabulary,
 )
 
 
@@ -78,6 +96,14 @@ class TestLexicalrichness(unittest.TestCase):
         self.assertIs(type(tokenize(self.s3)), list)
         self.assertIs(type(tokenize(self.emptystring)), list)
 
+    def test_tokenize_non_ascii(self):
+        """Non-ASCII characters are kept, and en/em dashes are deleted like hyphens."""
+        text = "Café–au—lait, “naïve” 2x façade\u00a0end"
+        self.assertEqual(preprocess(text), "caféaulait, “naïve” x façade\u00a0end")
+        self.assertEqual(
+            tokenize(text), ["caféaulait", "“naïve”", "x", "façade", "end"]
+        )
+
     def test_tokenize_str_error(self):
         """Ensures error is raised if tokenizer is set to None and input is a string."""
         with pytest.raises(AssertionError) as err:
@@ -108,6 +134,65 @@ class TestLexicalrichness(unittest.TestCase):
             list(list_sliding_window(test_list, 4)), [("a", "b", "c", "d")]
         )
 
+    def test_sliding_window_distinct_counts(self):
+        test_list = ["a", "b", "a", "c", "c", "a"]
+
+        for window_size in range(1, len(test_list) + 1):
+            self.assertEqual(
+                sliding_window_distinct_counts(test_list, window_size),
+                [
+                    len(set(window))
+                    for window in list_sliding_window(test_list, window_size)
+                ],
+            )
+        self.assertEqual(sliding_window_distinct_counts(test_list, 7), [])
+
+        token_ids, _ = encode_tokens(test_list)
+        for window_size in range(1, len(test_list) + 2):
+            self.assertEqual(
+                sliding_window_distinct_counts(token_ids, window_size).tolist(),
+                sliding_window_distinct_counts(test_list, window_size),
+            )
+
+    def test_segment_distinct_counts(self):
+        test_list = ["a", "b", "a", "c", "c", "a", "d"]
+        token_ids, _ = encode_tokens(test_list)
+
+        for segment_size in range(1, len(test_list) + 2):
+            expected = [
+                len(set(segment))
+                for segment in segment_generator(test_list, segment_size)
+            ]
+            self.assertEqual(segment_distinct_counts(test_list, segment_size), expected)
+            self.assertEqual(
+                segment_distinct_counts(token_ids, segment_size).tolist(), expected
+            )
+
+    def test_encode_tokens(self):
+        token_ids, vocab = encode_tokens(["a", "b", "a", "c"])
+        assert token_ids.dtype == np.int32
+        assert token_ids.tolist() == [0, 1, 0, 2]
+        assert vocab == ["a", "b", "c"]
+        assert previous_occurrence(token_ids).tolist() == [-1, -1, 0, -1]
+
+    def test_encode(self):
+        """Measures on the integer-encoded text match those on the list of words."""
+        plain = self.longtext
+        encoded = LexicalRichness(plain.wordlist, tokenizer=None, encode=True)
+        assert plain.token_ids is None
+        assert encoded.token_ids.dtype == np.int32
+        assert encoded.wordlist == plain.wordlist
+        assert (encoded.words, encoded.terms) == (plain.words, plain.terms)
+
+        for measure in ["ttr", "Maas", "yulek", "yulei", "herdanvm", "simpsond"]:
+            self.assertEqual(getattr(encoded, measure), getattr(plain, measure))
+        self.assertEqual(encoded.msttr(7), plain.msttr(7))
+        self.assertEqual(encoded.msttr(7, discard=False), plain.msttr(7, discard=False))
+        self.assertEqual(encoded.mattr(10), plain.mattr(10))
+        self.assertEqual(encoded.mtld(), plain.mtld())
+        self.assertEqual(encoded.hdd(), plain.hdd())
+        self.assertEqual(encoded.vocd(), plain.vocd())
+
     def test_segment_generator(self):
         print("testing segment_generator")
 
@@ -180,6 +265,11 @@ class TestLexicalrichness(unittest.TestCase):
         print("testing Yule's I")
         self.assertEqual(self.obj1.yulei, 8.0)
 
+    def test_yulei_distinct_terms(self):
+        # No repeated terms: inf, as the NumPy reduction gave before
+        with pytest.warns(RuntimeWarning):
+            assert LexicalRichness("hello world").yulei == np.inf
+
     def test_herdanvm(self):
         print("testing Herdan's Vm")
         self.assertEqual(self.obj1.herdanvm, 0.18708286933869708)
@@ -188,6 +278,10 @@ class TestLexicalrichness(unittest.TestCase):
         print("testing Simpson's D")
         self.assertEqual(self.obj1.simpsond, 0.06666666666666667)
 
+    def test_simpsond_single_word(self):
+        with pytest.warns(RuntimeWarning):
+            assert np.isnan(LexicalRichness("hello").simpsond)
+
     def test_msttr(self):
         print("testing msttr")
 
@@ -201,12 +295,39 @@ class TestLexicalrichness(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.obj1.msttr(segment_window=1.5)
 
+    def test_msttr_sizes(self):
+        sizes = [2, 5, 10, 25]
+        for discard in (True, False):
+            scores = self.longtext.msttr(segment_window=sizes, discard=discard)
+            assert isinstance(scores, np.ndarray)
+            expected = [self.longtext.msttr(size, discard) for size in sizes]
+            self.assertEqual(scores.tolist(), expected)
+
+        with self.assertRaises(ValueError):
+            self.obj1.msttr(segment_window=[5, 0])
+
+    def test_profiles(self):
+        profile = self.obj1.msttr_profile(segment_window=5, discard=False)
+        assert isinstance(profile, np.ndarray)
+        assert profile.tolist() == [0.8, 1.0]
+        assert self.obj1.msttr_profile(segment_window=5).tolist() == [0.8]
+
+        profile = self.longtext.mattr_profile(window_size=10)
+        assert len(profile) == self.longtext.words - 10 + 1
+        windows = list_sliding_window(self.longtext.wordlist, 10)
+        assert profile.tolist() == [len(set(window)) / 10 for window in windows]
+        self.assertEqual(sum(profile.tolist()) / len(profile), self.longtext.mattr(10))
+
+        with self.assertRaises(ValueError):
+            self.obj1.mattr_profile(window_size=0)
+
     def test_mattr(self):
         print("testing mattr")
 
         self.assertEqual(self.obj1.mattr(window_size=5), 0.9)
         self.assertEqual(self.obj1.mattr(window_size=1), 1)
         self.assertEqual(self.obj1.mattr(window_size=self.obj1.words), self.obj1.ttr)
+        self.assertEqual(self.longtext.mattr(window_size=10), 0.958333333333333)
 
         with self.assertRaises(ValueError):
             self.obj1.mattr(window_size=0)
@@ -226,7 +347,15 @@ class TestLexicalrichness(unittest.TestCase):
     def test_hdd(self):
         print("testing hdd")
 
-        self.assertEqual(self.obj1.hdd(draws=5), 0.8833333333333332)
+        self.assertEqual(self.obj1.hdd(draws=5), 0.8833333333333334)
+        self.assertAlmostEqual(self.obj1.hdd(draws=5), 53 / 60)
+
+        # array of draws: one score per sample size
+        scores = self.obj1.hdd(draws=[1, 5, 10])
+        assert scores.shape == (3,)
+        self.assertAlmostEqual(scores[0], 1)
+        self.assertEqual(scores[1], self.obj1.hdd(draws=5))
+        self.assertAlmostEqual(scores[2], self.obj1.ttr)
 
         with self.assertRaises(ValueError):
             self.obj1.hdd(draws=0)
@@ -234,6 +363,10 @@ class TestLexicalrichness(unittest.TestCase):
             self.obj1.hdd(draws=-5)
         with self.assertRaises(ValueError):
             self.obj1.hdd(draws=1.5)
+        with self.assertRaises(ValueError):
+            self.obj1.hdd(draws=[5, 11])
+        with self.assertRaises(ValueError):
+            self.obj1.hdd(draws=[0, 5])
 
     def test_ttr_nd(self):
         self.assertEqual(ttr_nd(N=100, D=2), 0.1809975124224178)
@@ -258,6 +391,96 @@ class TestLexicalrichness(unittest.TestCase):
         assert first_seed42 != third_seed0
         assert second_seed42 != third_seed0
 
+    def test_random_ordered_positions(self):
+        rng = np.random.default_rng(0)
+        # short population uses the shuffled table, long one the redraw loop
+        for population in [8, 10**6]:
+            positions = random_ordered_positions(population, 200, 5, rng)
+            assert positions.shape == (200, 5)
+            for row in positions.tolist():
+                assert len(set(row)) == 5 and 0 <= min(row) and max(row) < population
+        # every position is equally likely at every step
+        counts = np.bincount(random_ordered_positions(4, 4000, 4, rng)[:, 3])
+        assert counts.min() > 900
+
+        token_ids, _ = encode_tokens(self.longtext.wordlist)
+        distinct = random_prefix_distinct_counts(token_ids, 30, len(token_ids), rng)
+        assert (np.diff(distinct, axis=1) >= 0).all() and (distinct[:, 0] == 1).all()
+        assert (distinct[:, -1] == self.longtext.terms).all()
+        positions = random_ordered_positions(
+            len(token_ids), 1, 20, np.random.default_rng(3)
+        )
+        prefix = random_prefix_distinct_counts(
+            token_ids, 1, 20, np.random.default_rng(3)
+        )
+        assert prefix[0].tolist() == [
+            len(set(token_ids[positions[0, :k]].tolist())) for k in range(1, 21)
+        ]
+
+    def test_vocd_parallel(self):
+        serial = self.longtext.vocd(iterations=4)
+        self.assertEqual(self.longtext.vocd(iterations=4, n_jobs=3), serial)
+        self.assertEqual(
+            self.longtext.vocd(iterations=4, seed=np.random.SeedSequence(42)), serial
+        )
+
+        # concurrent calls do not share random state
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(
+                executor.map(lambda seed: self.longtext.vocd(seed=seed), range(4))
+            )
+        assert results == [self.longtext.vocd(seed=seed) for seed in range(4)]
+
+        # a SeedSequence is not consumed by vocd
+        seed = np.random.SeedSequence(1)
+        self.assertEqual(self.longtext.vocd(seed=seed), self.longtext.vocd(seed=seed))
+        assert seed.n_children_spawned == 0
+
+        first, second = spawn_generators(0, 2)
+        assert first.random() == spawn_generators(0, 2)[0].random()
+        assert first.random() != second.random()
+
+    def test_vocd_analytic(self):
+        analytic = self.longtext.vocd(method="analytic")
+        assert analytic == self.longtext.vocd(method="analytic", seed=0)
+        # the expected TTR curve is what the random samples estimate
+        assert abs(analytic - self.longtext.vocd(within_sample=1000)) < 0.05 * analytic
+
+        with pytest.raises(ValueError):
+            self.longtext.vocd(method="exact")
+
+    def test_hypergeom_absent_probability(self):
+        from scipy.stats import hypergeom
+
+        freq = np.array([1, 2, 5, 30, 99, 100])
+        draws = np.array([0, 1, 2, 50, 70, 100])
+        np.testing.assert_allclose(
+            hypergeom_absent_probability(100, freq, draws),
+            hypergeom.pmf(0, 100, freq[:, None], draws),
+            rtol=1e-12,
+            atol=1e-15,
+        )
+        assert hypergeom_absent_probability(100, freq, 5).shape == (6,)
+
+        # a (freq, draws) cell has the same value whatever else is asked for, and is accurate
+        # for large texts
+        words, draws = 2 * 10**6, [3, 3000]
+        expected = math.exp(
+            math.fsum(math.log1p(-1000 / (words - j)) for j in range(3000))
+        )
+        wide = hypergeom_absent_probability(words, np.arange(1, 2001), draws)
+        single = hypergeom_absent_probability(words, [1000], 3000)
+        assert wide[999, 1] == single[0]
+        assert single[0] == pytest.approx(expected, rel=1e-13)
+
+    def test_expected_terms(self):
+        spectrum = self.longtext.frequency_spectrum
+        assert spectrum.expected_terms(0) == 0
+        assert spectrum.expected_terms(1) == pytest.approx(1)
+        assert spectrum.expected_terms(spectrum.words) == pytest.approx(spectrum.terms)
+        assert spectrum.expected_terms([35, 50]).shape == (2,)
+        assert spectrum.expected_terms([35, 50])[1] == spectrum.expected_terms(50)
+
     def test_vocd_fig(self):
         print("testing voc-D figure")
         assert isinstance(self.longtext.vocd_fig(), matplotlib.pyplot.Axes)
@@ -278,6 +501,237 @@ class TestLexicalrichness(unittest.TestCase):
         assert tab.fv_i_N.min() >= 0
         assert tab.sum_element.min() >= 0
 
+    def test_frequency_spectrum(self):
+        spectrum = self.longtext.frequency_spectrum
+        assert isinstance(spectrum, FrequencySpectrum)
+        # computed once and shared between the spectrum-based measures
+        assert self.longtext.frequency_spectrum is spectrum
+        assert spectrum.words == self.longtext.words
+        assert spectrum.terms == self.longtext.terms
+
+        tab = frequency_wordfrequency_table(self.longtext.wordlist)
+        assert spectrum.freq.tolist() == tab.freq.tolist()
+        assert spectrum.fv_i_N.tolist() == tab.fv_i_N.tolist()
+        assert spectrum.sum_element == tab.sum_element.sum()
+
+    def test_frequency_spectrum_update(self):
+        wordlist = self.longtext.wordlist
+        spectrum = FrequencySpectrum.from_tokens(wordlist[:20])
+        spectrum.update(wordlist[20:])
+        full = self.longtext.frequency_spectrum
+        assert (spectrum.words, spectrum.terms) == (full.words, full.terms)
+        assert spectrum.freq.tolist() == full.freq.tolist()
+        assert spectrum.fv_i_N.tolist() == full.fv_i_N.tolist()
+        assert spectrum.sum_element == full.sum_element
+
+    def test_incremental(self):
+        lex = IncrementalLexicalRichness()
+        assert lex.words == 0
+        for chunk in self.s1.split(","):
+            lex.update(chunk)
+
+        counts = "words terms ttr rttr cttr Herdan Summer Dugast Maas yulek yulei"
+        for measure in counts.split() + ["herdanvm", "simpsond"]:
+            self.assertEqual(getattr(lex, measure), getattr(self.obj1, measure))
+        self.assertEqual(lex.mtld(), self.obj1.mtld())
+        self.assertEqual(lex.update("more text").words, 12)
+
+        # a reassigned wordlist is counted once, not again on the next update
+        lex = IncrementalLexicalRichness("a b c")
+        lex.wordlist = ["a", "b"]
+        lex.update("c d")
+        assert (lex.words, lex.terms) == (4, 4)
+        assert lex.wordlist == ["a", "b", "c", "d"]
+
+        counts_only = IncrementalLexicalRichness(self.s1, keep_tokens=False)
+        self.assertEqual(counts_only.yulek, self.obj1.yulek)
+        with pytest.raises(ValueError):
+            counts_only.mattr(window_size=5)
+
+    def test_keep_tokens(self):
+        text = " ".join(self.longtext.wordlist)
+        for encode in (False, True):
+            lex = LexicalRichness(text, encode=encode, keep_tokens=False)
+            assert lex.wordlist is None and lex.token_ids is None
+            counts = "words terms ttr rttr cttr Herdan Summer Dugast Maas yulek yulei"
+            for measure in counts.split() + ["herdanvm", "simpsond"]:
+                self.assertEqual(getattr(lex, measure), getattr(self.longtext, measure))
+            self.assertEqual(lex.hdd(draws=42), self.longtext.hdd(draws=42))
+
+            for measure in ["msttr", "mattr", "mtld", "vocd"]:
+                with pytest.raises(ValueError, match="keep_tokens=False"):
+                    getattr(lex, measure)()
+
+            scores = lex.report(["ttr", "hdd", "mtld"], errors="coerce")
+            assert scores["ttr"] == self.longtext.ttr
+            assert np.isnan(scores["mtld"])
+
+    def test_vocabulary(self):
+        vocab = Vocabulary(["of"])
+        text = " ".join(self.longtext.wordlist)
+        shared = [LexicalRichness(t, vocabulary=vocab) for t in [self.s1, text, text]]
+        assert shared[1].vocab is shared[2].vocab is vocab
+        assert np.array_equal(shared[1].token_ids, shared[2].token_ids)
+        assert vocab.get("of") == 0 and vocab[0] == "of" and "textual" in vocab
+        assert len(vocab) == len(set(self.obj1.wordlist + self.longtext.wordlist))
+        assert vocab.decode(vocab.encode(["of", "measure"])) == ["of", "measure"]
+
+        for lex, expected in [(shared[0], self.obj1), (shared[1], self.longtext)]:
+            assert lex.wordlist == expected.wordlist
+            assert lex.terms == expected.terms
+            for measure in ["ttr", "Maas", "yulek", "herdanvm"]:
+                self.assertEqual(getattr(lex, measure), getattr(expected, measure))
+            self.assertEqual(lex.mtld(), expected.mtld())
+            self.assertEqual(lex.hdd(draws=5), expected.hdd(draws=5))
+            self.assertEqual(lex.mattr(window_size=5), expected.mattr(window_size=5))
+
+        counts_only = LexicalRichness(text, vocabulary=vocab, keep_tokens=False)
+        assert len(vocab) == len(set(self.obj1.wordlist + self.longtext.wordlist))
+        spectrum = counts_only.frequency_spectrum
+        assert spectrum.term_freq == shared[1].frequency_spectrum.term_freq
+        self.assertEqual(counts_only.yulei, self.longtext.yulei)
+
+    def test_repr(self):
+        text = " ".join(self.longtext.wordlist)
+        for lex in [self.longtext, LexicalRichness(text, encode=True)]:
+            assert len(repr(lex)) < 400
+            assert "words=57, terms=39" in repr(lex)
+            assert "'measure', 'of', 'textual'" in repr(lex)
+            assert str(lex) == " ".join(lex.wordlist[:10]) + " ..."
+            assert lex.to_text() == text
+
+            stream = io.StringIO()
+            assert lex.to_text(stream, sep="\n") is None
+            assert stream.getvalue() == "\n".join(lex.wordlist)
+
+        assert str(self.obj1) == " ".join(self.obj1.wordlist)
+        assert str(self.emptyobj) == ""
+        assert self.emptyobj.to_text() == ""
+
+        counts_only = IncrementalLexicalRichness(text, keep_tokens=False)
+        assert "wordlist=<not kept>" in repr(counts_only)
+        with pytest.raises(ValueError):
+            counts_only.to_text()
+
+    def test_from_file(self):
+        text = self.longtext.wordlist
+        text = (
+            " ".join(text)
+            + "\nCafé–au—lait, “naïve” supercalifragilisticexpialidocious 42 end."
+        )
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "text.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+
+            # chunks end on whitespace and cover the whole file
+            chunks = list(iter_text_chunks(path, chunk_size=16))
+            assert "".join(chunks) == text
+            assert all(chunk[-1].isspace() for chunk in chunks[:-1])
+
+            full = LexicalRichness(text)
+            lex = LexicalRichness.from_file(path, chunk_size=16)
+            assert lex.wordlist == full.wordlist
+            for measure in ["words", "terms", "ttr", "yulek", "herdanvm"]:
+                self.assertEqual(getattr(lex, measure), getattr(full, measure))
+            self.assertEqual(lex.mattr(window_size=10), full.mattr(window_size=10))
+
+            counts_only = LexicalRichness.from_file(
+                path, keep_tokens=False, chunk_size=7
+            )
+            self.assertEqual(counts_only.words, full.words)
+            self.assertEqual(counts_only.yulei, full.yulei)
+            with pytest.raises(ValueError):
+                counts_only.mtld()
+
+            incremental = IncrementalLexicalRichness.from_file(path, chunk_size=16)
+            assert incremental.wordlist == full.wordlist
+
+            empty = os.path.join(tmpdir, "empty.txt")
+            open(empty, "w").close()
+            assert LexicalRichness.from_file(empty).words == 0
+
+    def test_report(self):
+        params = {"msttr": {"segment_window": 25}, "mattr": {"window_size": 25}}
+        for lex in [
+            self.longtext,
+            LexicalRichness(self.longtext.wordlist, None, None, True),
+        ]:
+            report = lex.report(**params)
+            self.assertEqual(
+                list(report),
+                [
+                    "words",
+                    "terms",
+                    "ttr",
+                    "rttr",
+                    "cttr",
+                    "Herdan",
+                    "Summer",
+                    "Dugast",
+                    "Maas",
+                    "yulek",
+                    "yulei",
+                    "herdanvm",
+                    "simpsond",
+                    "msttr",
+                    "mattr",
+                    "mtld",
+                    "hdd",
+                    "vocd",
+                ],
+            )
+            for name, value in report.items():
+                expected = getattr(self.longtext, name)
+                if callable(expected):
+                    expected = expected(**params.get(name, {}))
+                self.assertEqual(value, expected, name)
+            assert lex._intermediates is None
+
+        # the intermediates reach the measures without being set on the (possibly shared) object
+        class Probe(LexicalRichness):
+            def mattr(self, window_size=100):
+                seen.append((self._intermediate("previous"), lex._intermediates))
+                return super().mattr(window_size)
+
+        seen = []
+        lex = Probe(self.s1)
+        lex.report(["yulek", "mattr"], mattr={"window_size": 3})
+        assert seen[0][0] is not None and seen[0][1] is None
+        assert lex._spectrum is not None
+
+        report = self.obj1.report(
+            ["ttr", "mattr"], errors="coerce", mattr={"window_size": 99}
+        )
+        self.assertEqual(report["ttr"], self.obj1.ttr)
+        assert np.isnan(report["mattr"])
+        with pytest.raises(ValueError):
+            self.obj1.report(["mattr"], mattr={"window_size": 99})
+        with pytest.raises(ValueError):
+            self.obj1.report(["ttr", "unknown"])
+        with pytest.raises(ValueError):
+            self.obj1.report(["ttr"], ttr={"draws": 1})
+        with pytest.raises(ValueError, match="errors should be"):
+            self.obj1.report(["ttr"], errors="ignore")
+
+    def test_lazy_imports(self):
+        """Basic measures should not import matplotlib, pandas, scipy or textblob."""
+        code = (
+            "import sys\n"
+            "from lexicalrichness import LexicalRichness\n"
+            "lex = LexicalRichness('some text with some words and some more words')\n"
+            "lex.ttr, lex.Maas, lex.mattr(window_size=3), lex.mtld()\n"
+            "heavy = ('matplotlib', 'pandas', 'scipy', 'textblob')\n"
+            "print(sorted(m for m in sys.modules if m.split('.')[0] in heavy))\n"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code],
+            check=True,
+            stdout=subprocess.PIPE,
+            universal_newlines=True,
+        )
+        assert out.stdout.strip() == "[]"
+
 
 if __name__ == "__main__":
     unittest.main()
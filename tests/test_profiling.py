@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `lexicalrichness.profiling`."""
+
+import json
+import unittest
+
+import lexicalrichness.lexicalrichness as lr
+from lexicalrichness import IncrementalLexicalRichness, LexicalRichness, Profiler
+
+
+class TestProfiling(unittest.TestCase):
+    """Tests for the stage profiler."""
+
+    def setUp(self):
+        self.text = (
+            "The quick brown fox jumps over the lazy dog and the quick cat. " * 20
+        )
+
+    def test_profiler(self):
+        with Profiler() as prof:
+            assert prof.active
+            lex = LexicalRichness(self.text)
+            lex.ttr
+            lex.yulek
+            lex.mattr(window_size=10)
+            LexicalRichness(self.text, preprocessor=str.lower).mtld()
+            IncrementalLexicalRichness(self.text).update("more words")
+        assert not prof.active
+
+        stages = prof.to_dict()
+        for stage in [
+            "init",
+            "tokenizer",
+            "preprocessor",
+            "frequency_spectrum",
+            "update",
+        ]:
+            assert stage in stages
+        assert stages["init"]["calls"] == 3
+        assert stages["preprocessor"]["calls"] == 1
+        assert stages["tokenizer"]["calls"] == 4
+        assert stages["ttr"]["tokens"] == lex.words
+        # mattr spends its time in mattr_profile
+        assert stages["mattr"]["own_seconds"] <= stages["mattr"]["seconds"]
+        assert stages["mattr_profile"]["calls"] == 1
+        json.dumps(stages)
+
+        # nothing is recorded, and the classes are restored, once stopped
+        assert "rttr" not in stages
+        lex.rttr
+        assert "rttr" not in prof.to_dict()
+        assert not hasattr(lr.LexicalRichness.__init__, "__wrapped__")
+        assert isinstance(lr._optimize, lr._LazyModule)
+
+    def test_vocd_stages(self):
+        lex = LexicalRichness(self.text)
+        with Profiler() as prof:
+            lex.vocd(iterations=2)
+        stages = prof.to_dict()
+        assert stages["vocd_sampling"]["calls"] == 2
+        assert stages["curve_fit"]["calls"] == 2
+        assert stages["vocd"]["seconds"] >= stages["curve_fit"]["seconds"]
+
+    def test_merge(self):
+        first, second = Profiler(), Profiler()
+        with first:
+            LexicalRichness(self.text).ttr
+        with second:
+            LexicalRichness(self.text).ttr
+            LexicalRichness(self.text).ttr
+
+        merged = Profiler().merge(first).merge(second.to_dict())
+        self.assertEqual(merged.to_dict()["ttr"]["calls"], 3)
+        self.assertEqual(
+            merged.to_dict()["ttr"]["tokens"],
+            first.to_dict()["ttr"]["tokens"] + second.to_dict()["ttr"]["tokens"],
+        )
+        assert "ttr" in merged.report()
+
+        merged.reset()
+        assert merged.to_dict() == {}
+
+    def test_nested_profilers(self):
+        outer = Profiler().start()
+        with Profiler() as inner:
+            LexicalRichness(self.text)
+        LexicalRichness(self.text)
+        outer.stop()
+        self.assertEqual(inner.to_dict()["init"]["calls"], 1)
+        self.assertEqual(outer.to_dict()["init"]["calls"], 2)